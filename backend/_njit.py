@@ -0,0 +1,25 @@
+# backend/_njit.py
+# Optional numba shim: engines decorate hot loops with @njit and keep working
+# (as plain Python) when numba is not installed.
+
+import os
+
+# cache=True kernels are written here instead of next to the sources, so a
+# warmed cache can be baked into the image / mounted on a volume and survive
+# container restarts. Must be set before numba is first imported.
+os.environ.setdefault(
+    'NUMBA_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.numba_cache')
+)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit — supports @njit and @njit(...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
@@ -1,6 +1,6 @@
 # backend/company_type_classifier.py
 """
-HybridCompanyClassifier — RF + KMeans + networkx (PageRank) + QUBO-inspired ensemble
+HybridCompanyClassifier — RF + archetype k-means + PageRank + QUBO-inspired ensemble
 for company type classification (growth / value / dividend / blend).
 
 No external LLMs required. Trains once at startup on synthetic archetype data.
@@ -8,18 +8,30 @@ No external LLMs required. Trains once at startup on synthetic archetype data.
 
 from __future__ import annotations
 
+import functools
 import logging
 import math
-from typing import Dict, List, Tuple, Any
+import operator
+import threading
+from typing import Any, Callable, Dict, List, Tuple
 
 import numpy as np
 
+from _njit import NUMBA_AVAILABLE, njit
+
 logger = logging.getLogger(__name__)
 
 # ── Feature order ──────────────────────────────────────────────────────────────
 FEATURES = ['pe_z', 'gr_z', 'yield_z', 'pb_z', 'cap_log_norm', 'moat', 'growth_dim', 'quality_dim']
 CLASSES  = ['growth', 'value', 'dividend', 'blend']
 
+# Fetches all features from a dict in FEATURES order with one C-level call
+_FEATURE_GETTER = operator.itemgetter(*FEATURES)
+
+# Constant rfImportances / graphCentrality returned by the rule-based fallback
+_FALLBACK_IMPORTANCES: Dict[str, float] = {f: round(1.0 / len(FEATURES), 4) for f in FEATURES}
+_FALLBACK_CENTRALITY: Dict[str, float]  = {f: 0.0 for f in FEATURES}
+
 # Archetype feature vectors (mean per class)
 # pe_z, gr_z, yield_z, pb_z, cap_log_norm, moat, growth_dim, quality_dim
 _ARCHETYPES: Dict[str, List[float]] = {
@@ -35,82 +47,354 @@ _NOISE: List[float] = [0.6, 0.7, 0.6, 0.5, 0.15, 0.12, 0.12, 0.10]
 
 def _build_synthetic_dataset(n_per_class: int = 120) -> Tuple[np.ndarray, np.ndarray]:
     """Generate synthetic labelled samples around each archetype."""
-    rng = np.random.default_rng(42)
-    Xs, ys = [], []
-    for label_idx, cls in enumerate(CLASSES):
-        mean  = np.array(_ARCHETYPES[cls])
-        noise = np.array(_NOISE)
-        X = rng.normal(loc=mean, scale=noise, size=(n_per_class, len(FEATURES)))
-        X[:, :4] = np.clip(X[:, :4], -3.0, 3.0)   # z-scores
-        X[:, 4:] = np.clip(X[:, 4:],  0.0, 1.0)   # 0–1 features
-        Xs.append(X)
-        ys.append(np.full(n_per_class, label_idx, dtype=int))
-    return np.vstack(Xs), np.concatenate(ys)
-
-
-def _build_causal_graph():
+    rng    = np.random.default_rng(42)
+    means  = np.repeat(np.array([_ARCHETYPES[c] for c in CLASSES]), n_per_class, axis=0)
+    scales = np.broadcast_to(np.array(_NOISE), means.shape)
+    X = rng.normal(loc=means, scale=scales)
+    np.clip(X[:, :4], -3.0, 3.0, out=X[:, :4])   # z-scores
+    np.clip(X[:, 4:],  0.0, 1.0, out=X[:, 4:])   # 0–1 features
+    y = np.repeat(np.arange(len(CLASSES)), n_per_class)
+    return X, y
+
+
+# Causal edges: (source, target, strength)
+_CAUSAL_EDGES: List[Tuple[str, str, float]] = [
+    ('gr_z',       'pe_z',        0.70),   # high growth → higher P/E
+    ('gr_z',       'yield_z',    -0.60),   # high growth → lower yield
+    ('moat',       'pe_z',        0.50),   # durable moat → premium P/E
+    ('moat',       'gr_z',        0.40),   # moat often correlates with sustained growth
+    ('yield_z',    'pb_z',       -0.30),   # high yield → lower P/B (typical)
+    ('pb_z',       'pe_z',        0.50),   # high P/B and high P/E co-move
+    ('growth_dim', 'gr_z',        0.60),   # quality growth dimension → actual SGR
+    ('quality_dim','moat',        0.55),   # profitability quality → moat
+]
+
+
+def _build_transition_matrix() -> np.ndarray:
+    """
+    Column-stochastic 8x8 transition matrix of the causal graph.
+    Dangling nodes (no out-edges) jump uniformly, as in networkx.pagerank.
+    """
+    n   = len(FEATURES)
+    idx = {f: i for i, f in enumerate(FEATURES)}
+    M   = np.zeros((n, n), dtype=np.float64)
+    for src, tgt, w in _CAUSAL_EDGES:
+        M[idx[tgt], idx[src]] += abs(w)
+    col_sums = M.sum(axis=0)
+    dangling = col_sums == 0.0
+    M[:, ~dangling] /= col_sums[~dangling]
+    M[:, dangling]   = 1.0 / n
+    return M
+
+
+_TRANSITION = _build_transition_matrix()
+
+
+def _build_causal_graph(
+    alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6
+) -> Dict[str, float]:
     """
-    Build a causal DiGraph representing feature relationships and return
-    (G, pagerank_dict).  Returns (None, None) if networkx is unavailable.
+    PageRank over the static causal feature graph via dense power iteration
+    (matches networkx.pagerank on the same weighted DiGraph).
     """
-    try:
-        import networkx as nx
-    except ImportError:
-        return None, None
-
-    G = nx.DiGraph()
-    for f in FEATURES:
-        G.add_node(f)
-
-    # Causal edges: (source, target, strength)
-    edges = [
-        ('gr_z',       'pe_z',        0.70),   # high growth → higher P/E
-        ('gr_z',       'yield_z',    -0.60),   # high growth → lower yield
-        ('moat',       'pe_z',        0.50),   # durable moat → premium P/E
-        ('moat',       'gr_z',        0.40),   # moat often correlates with sustained growth
-        ('yield_z',    'pb_z',       -0.30),   # high yield → lower P/B (typical)
-        ('pb_z',       'pe_z',        0.50),   # high P/B and high P/E co-move
-        ('growth_dim', 'gr_z',        0.60),   # quality growth dimension → actual SGR
-        ('quality_dim','moat',        0.55),   # profitability quality → moat
-    ]
-    for src, tgt, w in edges:
-        G.add_edge(src, tgt, weight=abs(w))
-
-    pr = nx.pagerank(G, weight='weight')
-    return G, pr
+    n = len(FEATURES)
+    r = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        r_next = alpha * (_TRANSITION @ r) + (1.0 - alpha) / n
+        converged = np.abs(r_next - r).sum() < n * tol
+        r = r_next
+        if converged:
+            break
+    return {f: float(r[i]) for i, f in enumerate(FEATURES)}
+
+
+def _pagerank_feature_weights(pr: Dict[str, float]) -> np.ndarray:
+    """Normalise PageRank scores to [0.5, 1.5] so no feature is zeroed out."""
+    weights = np.array([pr.get(f, 0.1) for f in FEATURES])
+    w_min, w_max = weights.min(), weights.max()
+    return 0.5 + (weights - w_min) / (w_max - w_min + 1e-9)
+
+
+# The causal graph is static, so PageRank and its feature weights are constants
+_PR_DICT: Dict[str, float] = _build_causal_graph()
+_PR_WEIGHTS: np.ndarray    = _pagerank_feature_weights(_PR_DICT)
+
+
+def _fit_archetype_centers(
+    X_scaled: np.ndarray, init: np.ndarray, max_iter: int = 300, tol: float = 1e-4
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lloyd's k-means seeded at the scaled archetypes — the same iteration and
+    stopping rule as sklearn's KMeans(init=..., n_init=1), without the estimator.
+    Returns (centers, labels).
+    """
+    tol     = float(np.mean(np.var(X_scaled, axis=0))) * tol
+    centers = init.astype(np.float64, copy=True)
+    x_sq    = np.einsum('ij,ij->i', X_scaled, X_scaled)[:, None]
+    labels_old = np.full(len(X_scaled), -1)
+    for _ in range(max_iter):
+        labels  = (x_sq - 2.0 * (X_scaled @ centers.T) + (centers ** 2).sum(axis=1)).argmin(axis=1)
+        shifted = centers.copy()
+        for k in range(len(centers)):
+            members = labels == k
+            if members.any():
+                shifted[k] = X_scaled[members].mean(axis=0)
+        shift, centers = float(((shifted - centers) ** 2).sum()), shifted
+        if np.array_equal(labels, labels_old) or shift <= tol:
+            break
+        labels_old = labels
+    labels = (x_sq - 2.0 * (X_scaled @ centers.T) + (centers ** 2).sum(axis=1)).argmin(axis=1)
+    return centers, labels
+
+
+@functools.lru_cache(maxsize=1)
+def _sklearn_bits():
+    """Import sklearn lazily (on first training), once per process."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    return RandomForestClassifier, StandardScaler
+
+
+# ── Quantized forest ───────────────────────────────────────────────────────────
+
+def _quantize_forest(rf) -> Dict[str, np.ndarray]:
+    """
+    Flatten a fitted RandomForestClassifier into contiguous node arrays with
+    uint8-quantized leaf probabilities (p * 255). Child indices are global
+    offsets into the concatenated arrays; -1 marks a leaf.
+    """
+    feature, threshold, left, right, leaf_q, roots = [], [], [], [], [], []
+    offset = 0
+    for est in rf.estimators_:
+        t     = est.tree_
+        is_lf = t.children_left == -1
+        value = t.value[:, 0, :]
+        proba = value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12)
+        roots.append(offset)
+        feature.append(t.feature.astype(np.int32))
+        threshold.append(t.threshold.astype(np.float64))
+        left.append(np.where(is_lf, -1, t.children_left + offset).astype(np.int32))
+        right.append(np.where(is_lf, -1, t.children_right + offset).astype(np.int32))
+        leaf_q.append(np.round(proba * 255.0).astype(np.uint8))
+        offset += t.node_count
+    return {
+        'feature':   np.ascontiguousarray(np.concatenate(feature)),
+        'threshold': np.ascontiguousarray(np.concatenate(threshold)),
+        'left':      np.ascontiguousarray(np.concatenate(left)),
+        'right':     np.ascontiguousarray(np.concatenate(right)),
+        'leaf_q':    np.ascontiguousarray(np.concatenate(leaf_q)),
+        'roots':     np.array(roots, dtype=np.int32),
+    }
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _qforest_predict_proba(X, feature, threshold, left, right, leaf_q, roots):
+        """
+        Decision-only forest: walk each tree once for all rows (tree-outer,
+        so a tree's nodes stay hot in cache across the batch), accumulate
+        uint8 leaf scores in int32 and divide once at the end.
+        """
+        n, n_cls = X.shape[0], leaf_q.shape[1]
+        acc = np.zeros((n, n_cls), dtype=np.int32)
+        Xf  = X.astype(np.float32)   # sklearn compares float32 inputs to thresholds
+        for r in range(roots.shape[0]):
+            root = roots[r]
+            for i in range(n):
+                node = root
+                while left[node] != -1:
+                    if Xf[i, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                for k in range(n_cls):
+                    acc[i, k] += leaf_q[node, k]
+
+        out = np.empty((n, n_cls), dtype=np.float64)
+        for i in range(n):
+            total = 0
+            for k in range(n_cls):
+                total += acc[i, k]
+            for k in range(n_cls):
+                out[i, k] = acc[i, k] / total if total > 0 else 1.0 / n_cls
+        return out
+
+
+# QUBO-inspired conflict penalties: rows = conditions, cols = CLASSES
+_PEN_COEF = np.array([
+    # growth value  dividend blend
+    [0.30,  0.00,  0.00,    0.00],   # yield_z > 1.5     — high yield contradicts growth
+    [0.25,  0.00,  0.00,    0.00],   # gr_z < -0.5       — negative growth contradicts growth
+    [0.00,  0.30,  0.00,    0.00],   # pe_z > 1.0        — expensive P/E contradicts value
+    [0.00,  0.20,  0.00,    0.00],   # growth_dim > 0.72 — strong growth dim contradicts value
+    [0.00,  0.00,  0.35,    0.00],   # gr_z > 1.5        — fast growers rarely sustain dividends
+    [0.00,  0.00,  0.25,    0.00],   # yield_z < 0.0     — low yield contradicts dividend
+])
+
+
+# Causal-insight sentence templates per class: (condition, EN, ES).
+# Conditions and str.format_map both read a {feature: value} dict.
+_InsightRow = Tuple[Callable[[Dict[str, float]], bool], str, str]
+
+_GROWTH_GR_EN = ("SGR z-score {gr_z:+.2f}σ above sector average", "SGR z-score {gr_z:+.2f}σ")
+_GROWTH_GR_ES = ("z-score de SGR {gr_z:+.2f}σ sobre el promedio del sector", "z-score de SGR {gr_z:+.2f}σ")
+_GROWTH_PE_EN = ("P/E premium {pe_z:+.2f}σ vs sector", "P/E near sector median")
+_GROWTH_PE_ES = ("prima de P/E {pe_z:+.2f}σ vs sector", "P/E cercano a la mediana del sector")
+
+
+def _growth_lead_rows() -> List[_InsightRow]:
+    """Opening growth sentence for each (gr_z > 0, pe_z > 0) combination."""
+    rows: List[_InsightRow] = []
+    for gi, gr_pos in enumerate((True, False)):
+        for pi, pe_pos in enumerate((True, False)):
+            rows.append((
+                lambda v, g=gr_pos, p=pe_pos: (v['gr_z'] > 0) == g and (v['pe_z'] > 0) == p,
+                f"Growth classification driven by {_GROWTH_GR_EN[gi]} and {_GROWTH_PE_EN[pi]}.",
+                f"Clasificación de crecimiento impulsada por {_GROWTH_GR_ES[gi]} y {_GROWTH_PE_ES[pi]}.",
+            ))
+    return rows
+
+
+_INSIGHT_TEMPLATES: Dict[str, List[_InsightRow]] = {
+    'growth': _growth_lead_rows() + [
+        (lambda v: v['moat'] > 0.60,
+         "High moat score ({moat:.2f}) supports sustained premium valuation.",
+         "Alto moat ({moat:.2f}) respalda una valoración premium sostenida."),
+    ],
+    'value': [
+        (lambda v: True,
+         "Value classification: P/E z-score {pe_z:+.2f}σ below sector average.",
+         "Clasificación valor: z-score de P/E {pe_z:+.2f}σ debajo del promedio del sector."),
+        (lambda v: v['yield_z'] > 0,
+         "Above-sector dividend yield (z={yield_z:+.2f}σ) reinforces value signal.",
+         "Dividendo por encima del sector (z={yield_z:+.2f}σ) refuerza la señal de valor."),
+        (lambda v: v['pb_z'] < -0.5,
+         "Below-average P/B ratio (z={pb_z:+.2f}σ) confirms value characteristics.",
+         "P/B bajo (z={pb_z:+.2f}σ) confirma características de valor."),
+    ],
+    'dividend': [
+        (lambda v: True,
+         "Dividend classification: high yield (z={yield_z:+.2f}σ above sector average).",
+         "Clasificación dividendo: alto rendimiento (z={yield_z:+.2f}σ sobre el promedio del sector)."),
+        (lambda v: v['gr_z'] < 0,
+         "Below-sector growth (z={gr_z:+.2f}σ) consistent with income-oriented profile.",
+         "Crecimiento bajo (z={gr_z:+.2f}σ) consistente con perfil orientado a ingresos."),
+    ],
+    'blend': [
+        (lambda v: True,
+         "Blend classification: balanced signals (gr_z={gr_z:+.2f}, pe_z={pe_z:+.2f}, moat={moat:.2f}).",
+         "Clasificación mixta: señales equilibradas (gr_z={gr_z:+.2f}, pe_z={pe_z:+.2f}, moat={moat:.2f})."),
+        (lambda v: v['quality_dim'] > 0.60,
+         "Above-average quality metrics suggest a quality compounder.",
+         "Métricas de calidad superiores sugieren un compounder de calidad."),
+    ],
+}
+
+
+_GROWTH_IDX = CLASSES.index('growth')
+_BLEND_IDX  = CLASSES.index('blend')
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _ensemble_kernel(rf_probs, rf_probs_w, d2, X, mkt_caps, pen_coef):
+        """
+        Fused per-row ensemble: RF blend, inverse-distance archetype probs,
+        QUBO penalties, argmax, mega-cap override and gnnScores normalisation.
+        Returns (type_idx, type_conf, km_best, gnn_norm).
+        """
+        n, n_cls = rf_probs.shape
+        type_idx  = np.empty(n, dtype=np.int64)
+        type_conf = np.empty(n, dtype=np.float64)
+        km_best   = np.empty(n, dtype=np.int64)
+        gnn_norm  = np.empty((n, n_cls), dtype=np.float64)
+        km_probs  = np.empty(n_cls, dtype=np.float64)
+        final     = np.empty(n_cls, dtype=np.float64)
+        cond      = np.empty(pen_coef.shape[0], dtype=np.float64)
+
+        for i in range(n):
+            # Archetype probabilities (distance-based)
+            kb, inv_sum = 0, 0.0
+            for k in range(n_cls):
+                if d2[i, k] < d2[i, kb]:
+                    kb = k
+                km_probs[k] = 1.0 / (np.sqrt(max(d2[i, k], 0.0)) + 1e-9)
+                inv_sum += km_probs[k]
+            km_best[i] = kb
+
+            # QUBO conditions — same order as _PEN_COEF rows
+            pe_z, gr_z, yield_z, growth_dim = X[i, 0], X[i, 1], X[i, 2], X[i, 6]
+            cond[0] = 1.0 if yield_z > 1.5 else 0.0
+            cond[1] = 1.0 if gr_z < -0.5 else 0.0
+            cond[2] = 1.0 if pe_z > 1.0 else 0.0
+            cond[3] = 1.0 if growth_dim > 0.72 else 0.0
+            cond[4] = 1.0 if gr_z > 1.5 else 0.0
+            cond[5] = 1.0 if yield_z < 0.0 else 0.0
+
+            best = 0
+            for k in range(n_cls):
+                pen = 0.0
+                for c in range(cond.shape[0]):
+                    pen += cond[c] * pen_coef[c, k]
+                blended  = 0.5 * rf_probs[i, k] + 0.5 * rf_probs_w[i, k]
+                final[k] = (0.70 * blended + 0.30 * km_probs[k] / (inv_sum + 1e-9)) - pen * 0.25
+                if final[k] > final[best]:
+                    best = k
+
+            # Mega-cap adjustment: very large companies rarely sustain pure-growth label
+            chosen = best
+            if (mkt_caps[i] >= 200e9 and best == _GROWTH_IDX
+                    and final[_BLEND_IDX] > 0.55 * final[best]):
+                chosen = _BLEND_IDX
+            type_idx[i]  = chosen
+            type_conf[i] = min(max(final[chosen], 0.0), 0.99)
+
+            # Normalise gnnScores to proper 0-1 probabilities for display
+            g_sum = 0.0
+            for k in range(n_cls):
+                g_sum += max(final[k], 0.0)
+            for k in range(n_cls):
+                gnn_norm[i, k] = max(final[k], 0.0) / g_sum if g_sum > 0 else 1.0 / n_cls
+
+        return type_idx, type_conf, km_best, gnn_norm
 
 
 class HybridCompanyClassifier:
     """
     Ensemble classifier combining:
       • Random Forest (sklearn) — primary probabilistic classifier
-      • KMeans (sklearn)        — distance-based archetype matching
-      • networkx PageRank       — feature importance re-weighting
+      • Archetype k-means       — distance-based archetype matching
+      • PageRank (NumPy)        — feature importance re-weighting
       • QUBO-inspired penalties — conflict penalty for contradictory signals
     """
 
     def __init__(self) -> None:
         self._rf     = None
-        self._km     = None
+        self._rf_onnx = None
+        self._qforest: Dict[str, np.ndarray] | None = None
         self._scaler = None
-        self._km_cluster_to_class: Dict[int, int] = {}
+        self._mu         = np.zeros(len(FEATURES))
+        self._sigma      = np.ones(len(FEATURES))
+        self._km_centers = np.zeros((len(CLASSES), len(FEATURES)))
+        self._km_center_sqnorms = np.zeros(len(CLASSES))
+        self._km_cluster_class: np.ndarray | None = None   # None → cluster i is class i
         self._pagerank: Dict[str, float] = {}
         self._feature_weights = np.ones(len(FEATURES))
+        self._weights_nontrivial = False
+        self._rf_importances_dict: Dict[str, float]   = {}
+        self._graph_centrality_dict: Dict[str, float] = {}
         self._trained = False
+        self._local   = threading.local()
         self._train()
 
     # ── Training ───────────────────────────────────────────────────────────────
 
     def _train(self) -> None:
         try:
-            from sklearn.ensemble import RandomForestClassifier
-            from sklearn.cluster import KMeans
-            from sklearn.preprocessing import StandardScaler
+            RandomForestClassifier, StandardScaler = _sklearn_bits()
 
             X, y = _build_synthetic_dataset(n_per_class=120)
 
-            self._scaler = StandardScaler()
-            X_scaled     = self._scaler.fit_transform(X)
+            self._scaler = StandardScaler().fit(X)
 
             # Random Forest
             self._rf = RandomForestClassifier(
@@ -121,42 +405,55 @@ class HybridCompanyClassifier:
                 class_weight='balanced',
             )
             self._rf.fit(X, y)
-
-            # KMeans initialised at scaled archetypes
-            arch_centers        = np.array([_ARCHETYPES[c] for c in CLASSES])
-            arch_centers_scaled = self._scaler.transform(arch_centers)
-            self._km = KMeans(
-                n_clusters=4,
-                init=arch_centers_scaled,
-                n_init=1,
-                random_state=42,
+            if NUMBA_AVAILABLE:
+                self._qforest = _quantize_forest(self._rf)
+            else:
+                # ONNX only serves as the fast path when numba is missing
+                self._rf_onnx = self._export_rf_onnx()
+
+            # Plain arrays for the hot path — skips sklearn per-call validation
+            self._mu         = self._scaler.mean_.astype(np.float64)
+            self._sigma      = self._scaler.scale_.astype(np.float64)
+
+            # Archetype clusters: k-means seeded at the scaled archetypes. The fitted
+            # centers drift off the archetypes (clipping skews the class means), so
+            # they are fitted rather than taken from _ARCHETYPES directly.
+            arch_centers     = np.array([_ARCHETYPES[c] for c in CLASSES])
+            centers, labels  = _fit_archetype_centers(
+                (X - self._mu) / self._sigma, (arch_centers - self._mu) / self._sigma,
             )
-            self._km.fit(X_scaled)
-
-            # Map cluster → class by majority vote
-            for cluster_id in range(4):
-                mask = self._km.labels_ == cluster_id
-                if mask.sum() == 0:
-                    self._km_cluster_to_class[cluster_id] = 3  # blend
-                    continue
-                counts = np.bincount(y[mask], minlength=4)
-                self._km_cluster_to_class[cluster_id] = int(counts.argmax())
-
-            # networkx PageRank → feature importance weights
-            _, pr = _build_causal_graph()
-            if pr:
-                self._pagerank = pr
-                weights = np.array([pr.get(f, 0.1) for f in FEATURES])
-                w_min, w_max = weights.min(), weights.max()
-                # Normalise to [0.5, 1.5] so no feature is zeroed out
-                self._feature_weights = (
-                    0.5 + (weights - w_min) / (w_max - w_min + 1e-9)
-                )
+            self._km_centers = np.ascontiguousarray(centers)
+            self._km_center_sqnorms = (self._km_centers ** 2).sum(axis=1)
+
+            # Map cluster → class by majority vote (blend for an empty cluster)
+            cluster_class = np.array([
+                np.bincount(y[labels == k], minlength=len(CLASSES)).argmax()
+                if (labels == k).any() else _BLEND_IDX
+                for k in range(len(CLASSES))
+            ])
+            if not np.array_equal(cluster_class, np.arange(len(CLASSES))):
+                self._km_cluster_class = cluster_class
+
+            # PageRank → feature importance weights (precomputed at import)
+            self._pagerank        = _PR_DICT
+            self._feature_weights = _PR_WEIGHTS
+            # Near-uniform weights make the weighted RF pass a duplicate of the raw one
+            self._weights_nontrivial = bool(np.max(np.abs(self._feature_weights - 1.0)) > 0.1)
+
+            # Display dicts are constant after training — round them once
+            self._rf_importances_dict = {
+                f: round(float(v), 4)
+                for f, v in zip(FEATURES, self._rf.feature_importances_)
+            }
+            self._graph_centrality_dict = {
+                f: round(float(self._pagerank.get(f, 0.0)), 4) for f in FEATURES
+            }
 
             self._trained = True
             logger.info(
-                "[HybridClassifier] Trained on %d samples. PR-weights: %s",
+                "[HybridClassifier] Trained on %d samples (%d trees). PR-weights: %s",
                 len(X),
+                self._rf.n_estimators,
                 {f: round(float(self._feature_weights[i]), 3)
                  for i, f in enumerate(FEATURES)},
             )
@@ -167,84 +464,144 @@ class HybridCompanyClassifier:
             )
             self._trained = False
 
+    def _export_rf_onnx(self):
+        """
+        Convert the fitted forest to an ONNX Runtime session for low-latency
+        inference. Returns None if skl2onnx/onnxruntime are unavailable.
+        """
+        try:
+            import onnxruntime as ort
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+        except ImportError:
+            return None
+
+        try:
+            onx = convert_sklearn(
+                self._rf,
+                initial_types=[('X', FloatTensorType([None, len(FEATURES)]))],
+                options={id(self._rf): {'zipmap': False}},
+            )
+            return ort.InferenceSession(
+                onx.SerializeToString(), providers=['CPUExecutionProvider']
+            )
+        except Exception as exc:
+            logger.warning("[HybridClassifier] ONNX export failed (%s) — using sklearn.", exc)
+            return None
+
+    def _scratch_buffer(self) -> np.ndarray:
+        """Per-thread (2, 8) input buffer reused across classify() calls."""
+        buf = getattr(self._local, 'buf', None)
+        if buf is None:
+            buf = self._local.buf = np.empty((2, len(FEATURES)), dtype=np.float64)
+        return buf
+
+    def _rf_predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        RF class probabilities for an (N, 8) matrix. Prefers the numba
+        quantized forest, then ONNX Runtime, then sklearn.
+        """
+        if self._qforest is not None:
+            q = self._qforest
+            return _qforest_predict_proba(
+                np.ascontiguousarray(X, dtype=np.float64),
+                q['feature'], q['threshold'], q['left'], q['right'], q['leaf_q'], q['roots'],
+            )
+        if self._rf_onnx is not None:
+            return self._rf_onnx.run(None, {'X': X.astype(np.float32)})[1]
+        return self._rf.predict_proba(X)
+
+    def _archetype_d2(self, X: np.ndarray) -> np.ndarray:
+        """(N, 4) squared scaled-space distance from each row to each class's cluster."""
+        X_scaled = (X - self._mu) / self._sigma
+        # ||x - c||² = ||c||² - 2 x·c + ||x||² — one (N, 8) @ (8, 4) product
+        d2 = (
+            self._km_center_sqnorms
+            - 2.0 * (X_scaled @ self._km_centers.T)
+            + np.einsum('ij,ij->i', X_scaled, X_scaled)[:, None]
+        )
+        if self._km_cluster_class is not None:
+            # Per class, the nearest of its clusters (inf → zero weight if it has none)
+            d2_cls = np.full_like(d2, np.inf)
+            for k, c in enumerate(self._km_cluster_class):
+                np.minimum(d2_cls[:, c], d2[:, k], out=d2_cls[:, c])
+            d2 = d2_cls
+        return d2
+
     # ── QUBO-inspired conflict penalties ───────────────────────────────────────
 
     def _qubo_penalties(self, feat: np.ndarray) -> np.ndarray:
-        """Return per-class conflict penalties (higher = worse fit)."""
-        pe_z, gr_z, yield_z, pb_z, _, moat, growth_dim, _ = feat
-        penalties = np.zeros(4)
-        idx = {c: i for i, c in enumerate(CLASSES)}
-
-        # Growth: high yield or negative growth are contradictory
-        if yield_z > 1.5:
-            penalties[idx['growth']] += 0.30
-        if gr_z < -0.5:
-            penalties[idx['growth']] += 0.25
-
-        # Value: expensive P/E or strong growth dim contradict value label
-        if pe_z > 1.0:
-            penalties[idx['value']] += 0.30
-        if growth_dim > 0.72:
-            penalties[idx['value']] += 0.20
-
-        # Dividend: fast growers rarely sustain high dividends
-        if gr_z > 1.5:
-            penalties[idx['dividend']] += 0.35
-        if yield_z < 0.0:
-            penalties[idx['dividend']] += 0.25
-
-        return penalties
+        """
+        Return per-class conflict penalties (higher = worse fit).
+        Accepts a single (8,) row or an (N, 8) matrix.
+        """
+        pe_z, gr_z, yield_z = feat[..., 0], feat[..., 1], feat[..., 2]
+        growth_dim          = feat[..., 6]
+        conditions = np.stack([
+            yield_z > 1.5, gr_z < -0.5,        # growth
+            pe_z > 1.0,    growth_dim > 0.72,  # value
+            gr_z > 1.5,    yield_z < 0.0,      # dividend
+        ], axis=-1).astype(np.float64)
+        return conditions @ _PEN_COEF
+
+    def _ensemble_numpy(
+        self,
+        rf_probs: np.ndarray,
+        rf_probs_w: np.ndarray,
+        d2: np.ndarray,
+        X: np.ndarray,
+        mkt_caps: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Blend RF + archetype probabilities, apply QUBO penalties and the
+        mega-cap override. Returns (type_idx, type_conf, km_best, gnn_norm).
+        NumPy twin of _ensemble_kernel, used when numba is unavailable.
+        """
+        n = len(X)
+        rf_probs_blended = 0.5 * rf_probs + 0.5 * rf_probs_w
+
+        # ── Archetype probabilities (distance-based) ───────────────────────
+        km_best  = d2.argmin(axis=1)
+        km_probs = 1.0 / (np.sqrt(np.maximum(d2, 0.0)) + 1e-9)
+        km_probs /= km_probs.sum(axis=1, keepdims=True) + 1e-9
+
+        # ── Ensemble + QUBO penalties ──────────────────────────────────────
+        ensemble_probs = 0.70 * rf_probs_blended + 0.30 * km_probs
+        final_scores   = ensemble_probs - self._qubo_penalties(X) * 0.25
+
+        # ── Decision ──────────────────────────────────────────────────────
+        rows      = np.arange(n)
+        best_idx  = final_scores.argmax(axis=1)
+        type_conf = np.clip(final_scores[rows, best_idx], 0.0, 0.99)
+
+        # Mega-cap adjustment: very large companies rarely sustain pure-growth label
+        blend_score = final_scores[:, _BLEND_IDX]
+        mega = (
+            (mkt_caps >= 200e9)
+            & (best_idx == _GROWTH_IDX)
+            & (blend_score > 0.55 * final_scores[rows, best_idx])
+        )
+        type_idx  = np.where(mega, _BLEND_IDX, best_idx)
+        type_conf = np.where(mega, np.clip(blend_score, 0.0, 0.99), type_conf)
+
+        # Normalise gnnScores to proper 0-1 probabilities for display
+        gnn_raw  = np.maximum(final_scores, 0.0)
+        gnn_sum  = gnn_raw.sum(axis=1, keepdims=True)
+        gnn_norm = np.where(gnn_sum > 0, gnn_raw / np.where(gnn_sum > 0, gnn_sum, 1.0), 0.25)
+
+        return type_idx, type_conf, km_best, gnn_norm
 
     # ── Causal insight text ────────────────────────────────────────────────────
 
     def _causal_insight(self, feat: np.ndarray, company_type: str) -> Dict[str, str]:
         """Generate causal-chain explanations in EN + ES (no LLM)."""
-        pe_z, gr_z, yield_z, pb_z, _, moat, growth_dim, quality_dim = feat
+        vals = dict(zip(FEATURES, feat.tolist()))
         en_lines: List[str] = []
         es_lines: List[str] = []
-
-        if company_type == 'growth':
-            gr_en = f"SGR z-score {gr_z:+.2f}σ above sector average" if gr_z > 0 else f"SGR z-score {gr_z:+.2f}σ"
-            pe_en = f"P/E premium {pe_z:+.2f}σ vs sector" if pe_z > 0 else "P/E near sector median"
-            en_lines.append(f"Growth classification driven by {gr_en} and {pe_en}.")
-
-            gr_es = f"z-score de SGR {gr_z:+.2f}σ sobre el promedio del sector" if gr_z > 0 else f"z-score de SGR {gr_z:+.2f}σ"
-            pe_es = f"prima de P/E {pe_z:+.2f}σ vs sector" if pe_z > 0 else "P/E cercano a la mediana del sector"
-            es_lines.append(f"Clasificación de crecimiento impulsada por {gr_es} y {pe_es}.")
-
-            if moat > 0.60:
-                en_lines.append(f"High moat score ({moat:.2f}) supports sustained premium valuation.")
-                es_lines.append(f"Alto moat ({moat:.2f}) respalda una valoración premium sostenida.")
-
-        elif company_type == 'value':
-            en_lines.append(f"Value classification: P/E z-score {pe_z:+.2f}σ below sector average.")
-            es_lines.append(f"Clasificación valor: z-score de P/E {pe_z:+.2f}σ debajo del promedio del sector.")
-            if yield_z > 0:
-                en_lines.append(f"Above-sector dividend yield (z={yield_z:+.2f}σ) reinforces value signal.")
-                es_lines.append(f"Dividendo por encima del sector (z={yield_z:+.2f}σ) refuerza la señal de valor.")
-            if pb_z < -0.5:
-                en_lines.append(f"Below-average P/B ratio (z={pb_z:+.2f}σ) confirms value characteristics.")
-                es_lines.append(f"P/B bajo (z={pb_z:+.2f}σ) confirma características de valor.")
-
-        elif company_type == 'dividend':
-            en_lines.append(f"Dividend classification: high yield (z={yield_z:+.2f}σ above sector average).")
-            es_lines.append(f"Clasificación dividendo: alto rendimiento (z={yield_z:+.2f}σ sobre el promedio del sector).")
-            if gr_z < 0:
-                en_lines.append(f"Below-sector growth (z={gr_z:+.2f}σ) consistent with income-oriented profile.")
-                es_lines.append(f"Crecimiento bajo (z={gr_z:+.2f}σ) consistente con perfil orientado a ingresos.")
-
-        else:  # blend
-            en_lines.append(
-                f"Blend classification: balanced signals "
-                f"(gr_z={gr_z:+.2f}, pe_z={pe_z:+.2f}, moat={moat:.2f})."
-            )
-            es_lines.append(
-                f"Clasificación mixta: señales equilibradas "
-                f"(gr_z={gr_z:+.2f}, pe_z={pe_z:+.2f}, moat={moat:.2f})."
-            )
-            if quality_dim > 0.60:
-                en_lines.append("Above-average quality metrics suggest a quality compounder.")
-                es_lines.append("Métricas de calidad superiores sugieren un compounder de calidad.")
+        for cond, en_tpl, es_tpl in _INSIGHT_TEMPLATES.get(company_type, _INSIGHT_TEMPLATES['blend']):
+            if cond(vals):
+                en_lines.append(en_tpl.format_map(vals))
+                es_lines.append(es_tpl.format_map(vals))
 
         return {
             'en': " ".join(en_lines),
@@ -271,88 +628,125 @@ class HybridCompanyClassifier:
         dict with keys: companyType, typeConf, rfType, rfConf, kmType,
                         gnnScores, causalInsight, rfImportances, graphCentrality
         """
-        feat = np.array([features.get(f, 0.0) for f in FEATURES], dtype=float)
+        try:
+            values = _FEATURE_GETTER(features)
+        except KeyError:
+            values = [features.get(f, 0.0) for f in FEATURES]
+        return self.classify_from_array(values, mkt_cap)
 
+    def classify_from_array(self, feat_array, mkt_cap: float = 0.0) -> Dict[str, Any]:
+        """
+        classify() for callers that already hold the 8 features in FEATURES
+        order (array, list or tuple) — skips the per-key dict lookups.
+        """
         if not self._trained or self._rf is None:
-            return self._rule_based_fallback(feat, mkt_cap)
+            return self._rule_based_fallback(np.asarray(feat_array, dtype=float), mkt_cap)
+
+        # Row 0 = raw features, row 1 = PageRank-weighted, filled in place
+        buf = self._scratch_buffer()
+        buf[0] = feat_array
+        if self._weights_nontrivial:
+            np.multiply(buf[0], self._feature_weights, out=buf[1])
+            rf_input = buf
+        else:
+            rf_input = buf[:1]
 
         try:
-            # ── RF probabilities ───────────────────────────────────────────
-            rf_probs = self._rf.predict_proba(feat.reshape(1, -1))[0]
-
-            # PageRank-weighted variant (blended 50/50 with raw)
-            weighted_feat    = feat * self._feature_weights
-            rf_probs_w       = self._rf.predict_proba(weighted_feat.reshape(1, -1))[0]
-            rf_probs_blended = 0.5 * rf_probs + 0.5 * rf_probs_w
-
-            # ── KMeans probabilities (distance-based) ──────────────────────
-            feat_scaled  = self._scaler.transform(feat.reshape(1, -1))
-            km_cluster   = int(self._km.predict(feat_scaled)[0])
-            km_class_idx = self._km_cluster_to_class.get(km_cluster, 3)
-            km_type      = CLASSES[km_class_idx]
-
-            dists    = np.linalg.norm(self._km.cluster_centers_ - feat_scaled, axis=1)
-            km_probs = np.zeros(4)
-            for cid, cidx in self._km_cluster_to_class.items():
-                inv_d = 1.0 / (dists[cid] + 1e-9)
-                km_probs[cidx] = max(km_probs[cidx], inv_d)
-            km_probs /= km_probs.sum() + 1e-9
-
-            # ── Ensemble ───────────────────────────────────────────────────
-            ensemble_probs = 0.70 * rf_probs_blended + 0.30 * km_probs
-
-            # ── QUBO penalties ─────────────────────────────────────────────
-            penalties    = self._qubo_penalties(feat)
-            final_scores = ensemble_probs - penalties * 0.25
-
-            # ── Decision ──────────────────────────────────────────────────
-            best_idx     = int(final_scores.argmax())
-            company_type = CLASSES[best_idx]
-            type_conf    = float(np.clip(final_scores[best_idx], 0.0, 0.99))
+            return self._classify_rows(buf[:1], np.array([mkt_cap], dtype=float), rf_input=rf_input)[0]
+        except Exception as exc:
+            logger.warning("[HybridClassifier] classify() error: %s", exc)
+            return self._rule_based_fallback(buf[0].copy(), mkt_cap)
 
-            # Mega-cap adjustment: very large companies rarely sustain pure-growth label
-            if mkt_cap >= 200e9 and company_type == 'growth':
-                blend_score = final_scores[CLASSES.index('blend')]
-                if blend_score > 0.55 * final_scores[best_idx]:
-                    company_type = 'blend'
-                    type_conf    = float(np.clip(blend_score, 0.0, 0.99))
+    def classify_many(
+        self,
+        features_matrix: np.ndarray,
+        mkt_caps: np.ndarray | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched classify() for bulk scoring.
 
-            rf_best  = int(rf_probs.argmax())
-            rf_type  = CLASSES[rf_best]
-            rf_conf  = float(rf_probs[rf_best])
+        Parameters
+        ----------
+        features_matrix : (N, 8) array — columns in FEATURES order
+        mkt_caps        : (N,) array of market caps in USD (default 0)
 
-            # Normalise gnnScores to proper 0-1 probabilities for display
-            gnn_raw  = np.maximum(final_scores, 0.0)
-            gnn_sum  = gnn_raw.sum()
-            gnn_norm = gnn_raw / gnn_sum if gnn_sum > 0 else np.ones(4) / 4.0
-            gnn_scores = {c: round(float(gnn_norm[i]), 4) for i, c in enumerate(CLASSES)}
+        Returns
+        -------
+        list of N dicts, each shaped like classify()'s return value
+        """
+        X = np.asarray(features_matrix, dtype=float).reshape(-1, len(FEATURES))
+        caps = (np.zeros(len(X)) if mkt_caps is None
+                else np.asarray(mkt_caps, dtype=float).reshape(-1))
 
-            rf_importances = {
-                f: round(float(v), 4)
-                for f, v in zip(FEATURES, self._rf.feature_importances_)
-            }
-            graph_centrality = {
-                f: round(float(self._pagerank.get(f, 0.0)), 4) for f in FEATURES
-            }
+        if self._trained and self._rf is not None:
+            try:
+                return self._classify_rows(X, caps)
+            except Exception as exc:
+                logger.warning("[HybridClassifier] classify_many() error: %s", exc)
 
-            insight = self._causal_insight(feat, company_type)
+        return [self._rule_based_fallback(X[i], float(caps[i])) for i in range(len(X))]
 
-            return {
+    def _classify_rows(
+        self,
+        X: np.ndarray,
+        mkt_caps: np.ndarray,
+        rf_input: np.ndarray | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized ensemble over an (N, 8) feature matrix.
+        `rf_input` may pass the prebuilt RF matrix: (2N, 8) [raw; weighted],
+        or just the (N, 8) raw rows when the PageRank weights are near-uniform.
+        """
+        n = len(X)
+
+        # ── RF probabilities ───────────────────────────────────────────────
+        # Raw rows + PageRank-weighted rows in one call (blended 50/50)
+        if rf_input is None:
+            rf_input = (np.vstack([X, X * self._feature_weights])
+                        if self._weights_nontrivial else X)
+        probs      = self._rf_predict_proba(rf_input)
+        rf_probs   = probs[:n]
+        rf_probs_w = probs[n:] if len(probs) > n else rf_probs
+
+        d2 = self._archetype_d2(X)
+
+        if NUMBA_AVAILABLE:
+            type_idx, type_conf, km_best, gnn_norm = _ensemble_kernel(
+                rf_probs, np.ascontiguousarray(rf_probs_w), d2, X, mkt_caps, _PEN_COEF,
+            )
+        else:
+            type_idx, type_conf, km_best, gnn_norm = self._ensemble_numpy(
+                rf_probs, rf_probs_w, d2, X, mkt_caps,
+            )
+
+        rows    = np.arange(n)
+        rf_best = rf_probs.argmax(axis=1)
+
+        # Round / convert whole columns once instead of per-element round(float())
+        type_list   = type_idx.tolist()
+        rf_list     = rf_best.tolist()
+        km_list     = km_best.tolist()
+        conf_list   = np.round(type_conf, 3).tolist()
+        rf_conf     = np.round(rf_probs[rows, rf_best], 3).tolist()
+        gnn_rounded = np.round(gnn_norm, 4).tolist()
+
+        results: List[Dict[str, Any]] = []
+        for i in range(n):
+            company_type = CLASSES[type_list[i]]
+            insight      = self._causal_insight(X[i], company_type)
+            results.append({
                 'companyType':     company_type,
-                'typeConf':        round(type_conf, 3),
-                'rfType':          rf_type,
-                'rfConf':          round(rf_conf, 3),
-                'kmType':          km_type,
-                'gnnScores':       gnn_scores,
+                'typeConf':        conf_list[i],
+                'rfType':          CLASSES[rf_list[i]],
+                'rfConf':          rf_conf[i],
+                'kmType':          CLASSES[km_list[i]],
+                'gnnScores':       dict(zip(CLASSES, gnn_rounded[i])),
                 'causalInsight':   insight['en'],
                 'causalInsightEs': insight['es'],
-                'rfImportances':   rf_importances,
-                'graphCentrality': graph_centrality,
-            }
-
-        except Exception as exc:
-            logger.warning("[HybridClassifier] classify() error: %s", exc)
-            return self._rule_based_fallback(feat, mkt_cap)
+                'rfImportances':   dict(self._rf_importances_dict),
+                'graphCentrality': dict(self._graph_centrality_dict),
+            })
+        return results
 
     # ── Rule-based fallback ────────────────────────────────────────────────────
 
@@ -383,18 +777,21 @@ class HybridCompanyClassifier:
             'gnnScores':       gnn_scores,
             'causalInsight':   insight['en'],
             'causalInsightEs': insight['es'],
-            'rfImportances':   {f: round(1.0 / len(FEATURES), 4) for f in FEATURES},
-            'graphCentrality': {f: 0.0 for f in FEATURES},
+            'rfImportances':   dict(_FALLBACK_IMPORTANCES),
+            'graphCentrality': dict(_FALLBACK_CENTRALITY),
         }
 
 
 # ── Module-level singleton ──────────────────────────────────────────────────────
 _classifier: HybridCompanyClassifier | None = None
+_classifier_lock = threading.Lock()
 
 
 def get_classifier() -> HybridCompanyClassifier:
-    """Return the module-level singleton, creating it on first call."""
+    """Return the module-level singleton, creating it on first call (thread-safe)."""
     global _classifier
     if _classifier is None:
-        _classifier = HybridCompanyClassifier()
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = HybridCompanyClassifier()
     return _classifier
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -151,6 +152,7 @@ class DilutionEngine:
     def __init__(self, fmp_api_key: str) -> None:
         self.fmp_api_key = fmp_api_key or ""
         self._last_sec_request = 0.0
+        self._sec_throttle_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # HTTP helpers
@@ -158,13 +160,14 @@ class DilutionEngine:
     def _sec_get(self, url: str, timeout: int = 25) -> Optional[requests.Response]:
         if not REQUESTS_AVAILABLE:
             return None
-        # throttle: SEC pide <10 req/s
-        elapsed = _now() - self._last_sec_request
-        if elapsed < _SEC_REQUEST_DELAY:
-            time.sleep(_SEC_REQUEST_DELAY - elapsed)
+        # throttle: SEC pide <10 req/s (el lock reparte el cupo entre hilos)
+        with self._sec_throttle_lock:
+            elapsed = _now() - self._last_sec_request
+            if elapsed < _SEC_REQUEST_DELAY:
+                time.sleep(_SEC_REQUEST_DELAY - elapsed)
+            self._last_sec_request = _now()
         try:
             resp = requests.get(url, headers=SEC_HEADERS, timeout=timeout)
-            self._last_sec_request = _now()
             if resp.ok:
                 return resp
             logger.warning("[Dilution] SEC %s → HTTP %s", url, resp.status_code)
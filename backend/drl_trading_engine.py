@@ -7,11 +7,29 @@ import logging
 import numpy as np
 import os
 import requests
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from numpy.lib.stride_tricks import sliding_window_view
+
+from _njit import NUMBA_AVAILABLE, njit, prange
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from urllib3.util.retry import Retry
+    URLLIB3_RETRY_AVAILABLE = True
+except ImportError:
+    URLLIB3_RETRY_AVAILABLE = False
+
 try:
     import gymnasium as gym
     from gymnasium import spaces
@@ -29,6 +47,249 @@ except ImportError:
 
 TRADING_DAYS = 252
 
+# Per-engine price cache bound (same default size as functools.lru_cache)
+_PRICE_CACHE_MAXSIZE = 128
+
+# TradingEnvironment trade-buffer action codes → API labels
+_TRADE_ACTIONS = {1: 'buy', 2: 'sell'}
+
+# Observation returned on the terminal step. Shared and read-only: the vec-env
+# wrappers copy observations out, and the env's own buffer is overwritten by
+# the reset() that follows, so it can't double as the terminal observation.
+_TERMINAL_OBS = np.zeros(23, dtype=np.float32)
+_TERMINAL_OBS.setflags(write=False)
+
+
+@njit(cache=True, fastmath=True)
+def _ema_jit(data, period):
+    """Sequential EMA recurrence — compiled by numba when available."""
+    ema = np.empty_like(data)
+    if len(data) == 0:
+        return ema
+    ema[0] = data[0]
+    alpha = 2.0 / (period + 1)
+    for i in range(1, len(data)):
+        ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
+    return ema
+
+
+@njit(cache=True, fastmath=True)
+def _macd_all(prices):
+    """
+    MACD(12, 26, 9) histogram in one pass: the two price EMAs and the signal
+    EMA of their difference advance together, so no intermediate series are
+    materialised. Same recurrences (and seeding) as three _ema_jit calls.
+    """
+    n = len(prices)
+    hist = np.zeros(n)
+    if n == 0:
+        return hist
+    a12, a26, a9 = 2.0 / 13, 2.0 / 27, 2.0 / 10
+    e12 = prices[0]
+    e26 = prices[0]
+    sig = 0.0
+    for i in range(1, n):
+        p = prices[i]
+        e12 = a12 * p + (1 - a12) * e12
+        e26 = a26 * p + (1 - a26) * e26
+        sig = a9 * (e12 - e26) + (1 - a9) * sig
+        hist[i] = e12 - e26 - sig
+    return hist
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _compute_features_jit(prices, volumes, out):
+    """
+    Fused single-pass version of DRLTradingEngine._compute_features_numpy.
+    `out` is a zeroed (n, 20) float64 array. The EMA/MACD recurrence runs
+    serially first; every other feature only reads a trailing window
+    (≤ 50 bars), so bars are independent and split across threads.
+    """
+    n = len(prices)
+    if n == 0:
+        return
+
+    # Serial preamble: MACD (12, 26, 9) histogram scaled by full-series std
+    hist = _macd_all(prices)
+    p_std = prices.std() + 1e-8
+    for i in range(n):
+        out[i, 6] = hist[i] / p_std
+
+    # Log prices once; every log-return feature below is a difference of these
+    log_p = np.log(prices + 1e-8)
+    sqrt_td = np.sqrt(TRADING_DAYS)
+    p0 = prices[0] + 1e-8
+
+    for i in prange(n):
+        p = prices[i]
+        out[i, 19] = p / p0 - 1                              # cumulative return
+
+        if i >= 1:
+            prev = prices[i-1]
+            out[i, 2] = log_p[i] - log_p[i-1]                    # 1d log return
+            out[i, 18] = (p - prev) / (prev + 1e-8)              # gap proxy
+
+        # Trailing SMA ratios and momentum / log-returns at 5, 10, 20, 50 bars
+        s = 0.0
+        for k in range(1, 51):
+            if k > i:
+                break
+            s += prices[i-k]
+            if k == 5:
+                out[i, 8] = p / (s / 5 + 1e-8) - 1
+                out[i, 3] = log_p[i] - log_p[i-5]
+                out[i, 14] = (p - prices[i-5]) / (prices[i-5] + 1e-8)
+            elif k == 10:
+                out[i, 9] = p / (s / 10 + 1e-8) - 1
+                out[i, 15] = (p - prices[i-10]) / (prices[i-10] + 1e-8)
+            elif k == 20:
+                out[i, 10] = p / (s / 20 + 1e-8) - 1
+                out[i, 4] = log_p[i] - log_p[i-20]
+                out[i, 16] = (p - prices[i-20]) / (prices[i-20] + 1e-8)
+                # Bollinger Band position
+                m = s / 20
+                v = 0.0
+                for j in range(i-20, i):
+                    v += (prices[j] - m) ** 2
+                out[i, 7] = (p - m) / (2 * np.sqrt(v / 20) + 1e-8)
+            elif k == 50:
+                out[i, 11] = p / (s / 50 + 1e-8) - 1
+                # Normalized close (z-score over 50-day window)
+                m = s / 50
+                v = 0.0
+                for j in range(i-50, i):
+                    v += (prices[j] - m) ** 2
+                out[i, 0] = (p - m) / (np.sqrt(v / 50) + 1e-8)
+
+        # High-low range proxy over prices[i-5:i+1]
+        if i >= 5:
+            hi = p
+            lo = p
+            tot = p
+            for j in range(i-5, i):
+                hi = max(hi, prices[j])
+                lo = min(lo, prices[j])
+                tot += prices[j]
+            out[i, 17] = (hi - lo) / (tot / 6 + 1e-8)
+
+        # Volume trend (10) and normalized volume (20)
+        if i >= 10:
+            sv = 0.0
+            for j in range(i-10, i):
+                sv += volumes[j]
+            out[i, 13] = volumes[i] / (sv / 10 + 1e-8) - 1
+        if i >= 20:
+            sv = 0.0
+            for j in range(i-20, i):
+                sv += volumes[j]
+            m = sv / 20
+            v = 0.0
+            for j in range(i-20, i):
+                v += (volumes[j] - m) ** 2
+            out[i, 1] = (volumes[i] - m) / (np.sqrt(v / 20) + 1e-8)
+
+        # RSI (14-day) over deltas[i-14:i]
+        if i >= 15:
+            g = 0.0
+            l = 0.0
+            for j in range(i-14, i):
+                d = prices[j+1] - prices[j]
+                if d > 0:
+                    g += d
+                else:
+                    l -= d
+            rs = (g / 14) / (l / 14 + 1e-8)
+            out[i, 5] = (rs / (1 + rs) - 0.5) * 2
+
+        # Volatility: std of log returns log_ret[i-20:i], annualized
+        if i >= 21:
+            m = 0.0
+            for j in range(i-20, i):
+                m += log_p[j+1] - log_p[j]
+            m /= 20
+            v = 0.0
+            for j in range(i-20, i):
+                r = log_p[j+1] - log_p[j]
+                v += (r - m) ** 2
+            out[i, 12] = np.sqrt(v / 20) * sqrt_td
+
+
+@njit(cache=True)
+def _max_drawdown(pv):
+    """Largest peak-to-trough decline as a fraction of the running peak (single pass)."""
+    peak = pv[0]
+    max_dd = 0.0
+    for v in pv:
+        if v > peak:
+            peak = v
+        if peak > 0:
+            dd = (peak - v) / peak
+            if dd > max_dd:
+                max_dd = dd
+    return max_dd
+
+
+@njit(cache=True)
+def _simulate_rule(prices, buy_sig, sell_sig, start, cash):
+    """
+    All-in/all-out simulation of precomputed buy/sell signals from bar
+    `start` on (signal arrays are aligned to prices[start:]). Returns
+    (actions, portfolio_values, trade_step, trade_action, trade_price,
+    trade_shares, final_cash); any open position is closed on the last bar.
+    """
+    n = len(prices)
+    m = max(n - start, 0)
+    actions = np.zeros(m, dtype=np.int8)
+    pv = np.empty(m, dtype=np.float64)
+    t_step = np.empty(m, dtype=np.int64)
+    t_action = np.empty(m, dtype=np.int8)
+    t_price = np.empty(m, dtype=np.float64)
+    t_shares = np.empty(m, dtype=np.int64)
+    k = 0
+    shares = 0
+    for j in range(m):
+        i = start + j
+        price = prices[i]
+        pv[j] = cash + shares * price
+        if buy_sig[j] and cash > 0:
+            n_shares = int(cash * 0.999 / price)
+            if n_shares > 0:
+                cash -= n_shares * price * 1.001
+                shares += n_shares
+                actions[j] = 1
+                t_step[k], t_action[k], t_price[k], t_shares[k] = i, 1, price, n_shares
+                k += 1
+        elif sell_sig[j] and shares > 0:
+            cash += shares * price * 0.999
+            actions[j] = 2
+            t_step[k], t_action[k], t_price[k], t_shares[k] = i, 2, price, shares
+            k += 1
+            shares = 0
+
+    # Close remaining position
+    if shares > 0:
+        cash += shares * prices[n - 1] * 0.999
+    return actions, pv, t_step[:k], t_action[:k], t_price[:k], t_shares[:k], cash
+
+
+def _action_counts(actions: np.ndarray) -> Dict[str, int]:
+    """Hold/buy/sell tally of an int8 action array in one bincount pass."""
+    counts = np.bincount(actions, minlength=3)
+    return {'hold': int(counts[0]), 'buy': int(counts[1]), 'sell': int(counts[2])}
+
+
+def _trailing_windows(x: np.ndarray, window: int) -> np.ndarray:
+    """Rows x[i-window:i] for i in [window, len(x)) — the bar itself excluded."""
+    if len(x) <= window:
+        return np.empty((0, window))
+    return sliding_window_view(x, window)[:-1]
+
+
+def _trailing_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """O(n) mean of x[i-window:i] for i in [window, len(x)) via a cumulative sum."""
+    cs = np.concatenate(([0.0], np.cumsum(x, dtype=float)))
+    return (cs[window:-1] - cs[:-window - 1]) / window
+
 
 class TrainingCallback(BaseCallback if SB3_AVAILABLE else object):
     """Callback to capture training metrics."""
@@ -46,6 +307,80 @@ class TrainingCallback(BaseCallback if SB3_AVAILABLE else object):
         return True
 
 
+@njit(cache=True, fastmath=True)
+def _env_step(prices, features, step_idx, cash, shares, action, commission, initial_cash, obs):
+    """
+    Numeric core of TradingEnvironment.step: execute the action, advance one
+    bar, force-close at the end and update `obs` in place to the next
+    observation (left untouched when terminated; `obs` must hold the current
+    observation on entry). Returns (cash, shares, step_idx, reward,
+    portfolio_value, terminated, trade_action, trade_shares), where
+    trade_action is 0 when no trade happened, else 1 = buy / 2 = sell.
+    """
+    n = len(prices)
+    price = prices[step_idx]
+    prev_value = cash + shares * price
+    trade_action = 0
+    trade_shares = 0
+
+    # Execute action
+    if action == 1 and cash > 0:  # Buy
+        n_shares = int(cash * (1 - commission) / price)
+        if n_shares > 0:
+            cash -= n_shares * price * (1 + commission)
+            shares += n_shares
+            trade_action = 1
+            trade_shares = n_shares
+    elif action == 2 and shares > 0:  # Sell
+        cash += shares * price * (1 - commission)
+        trade_action = 2
+        trade_shares = shares
+        shares = 0
+
+    # Move to next step
+    step_idx += 1
+    terminated = step_idx >= n
+    if terminated and shares > 0:  # Force sell remaining at end
+        cash += shares * prices[n - 1] * (1 - commission)
+        shares = 0
+
+    # Reward: percentage change in portfolio value
+    new_value = cash + shares * prices[min(step_idx, n - 1)]
+    reward = (new_value - prev_value) / prev_value
+
+    if not terminated:
+        n_feat = features.shape[1]
+        for j in range(n_feat):
+            obs[j] = features[step_idx, j]
+        # Position and cash ratio only move on a trade; on holds (the bulk of
+        # a trained policy's steps) the previous values in `obs` are current
+        if trade_action:
+            obs[n_feat] = 1.0 if shares > 0 else 0.0
+            obs[n_feat + 1] = cash / initial_cash
+        obs[n_feat + 2] = new_value / initial_cash
+
+    return cash, shares, step_idx, reward, new_value, terminated, trade_action, trade_shares
+
+
+def _warm_jit_kernels() -> None:
+    """
+    Compile every DRL kernel once on tiny inputs with the dtypes the engine
+    uses, so the first /drl/simulate request doesn't pay numba's JIT cost.
+    With cache=True this is a disk load after the first process has run.
+    """
+    n = 64
+    prices = np.linspace(100.0, 110.0, n)
+    features = np.zeros((n, 20))
+    _compute_features_jit(prices, np.ones(n), features)
+    _ema_jit(prices, 12)
+    _macd_all(prices)
+    _max_drawdown(prices)
+    no_sig = np.zeros(n - 20, dtype=np.bool_)
+    _simulate_rule(prices, no_sig, no_sig, 20, 10000.0)
+    _env_step(prices, features.astype(np.float32), 20, 10000.0, 0, 1, 0.001, 10000.0,
+              np.zeros(23, dtype=np.float32))
+
+
 class TradingEnvironment(gym.Env if SB3_AVAILABLE else object):
     """
     Custom Gymnasium environment for stock trading.
@@ -69,8 +404,11 @@ class TradingEnvironment(gym.Env if SB3_AVAILABLE else object):
                  initial_cash: float = 10000.0, commission: float = 0.001):
         if SB3_AVAILABLE:
             super().__init__()
-        self.prices = prices
-        self.features = features
+        # Features are stored as the float32 the observation space uses (one
+        # 80-byte row read per step); prices stay float64 since they drive the
+        # cash/share accounting and are read one scalar at a time
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
         self.initial_cash = initial_cash
         self.commission = commission
         self.n_steps = len(prices)
@@ -79,6 +417,15 @@ class TradingEnvironment(gym.Env if SB3_AVAILABLE else object):
             self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(23,), dtype=np.float32)
             self.action_space = spaces.Discrete(3)
 
+        # Episode history as preallocated Structure-of-Arrays buffers (at most one
+        # portfolio value and one trade per step); reset() only rewinds the counters.
+        self._pv = np.empty(self.n_steps, dtype=np.float64)
+        self._trade_step = np.empty(self.n_steps, dtype=np.int32)
+        self._trade_action = np.empty(self.n_steps, dtype=np.int8)
+        self._trade_price = np.empty(self.n_steps, dtype=np.float64)
+        self._trade_shares = np.empty(self.n_steps, dtype=np.int64)
+        self._obs_buf = np.zeros(23, dtype=np.float32)  # filled in place by _env_step
+
         self.reset()
 
     def reset(self, seed=None, options=None):
@@ -87,70 +434,64 @@ class TradingEnvironment(gym.Env if SB3_AVAILABLE else object):
         self.current_step = 20  # skip first 20 for indicator warmup
         self.cash = self.initial_cash
         self.shares = 0
-        self.trades = []
-        self.portfolio_values = []
+        self._pv_i = 0
+        self._trade_i = 0
+        obs = self._get_obs()  # also primes the buffer _env_step updates in place
         if SB3_AVAILABLE:
-            return self._get_obs(), {}
+            return obs, {}
         return None, {}
 
+    @property
+    def trades(self) -> List[Dict[str, Any]]:
+        """Trades of the current episode as dicts (materialized on access)."""
+        k = self._trade_i
+        return [
+            {'step': st, 'action': _TRADE_ACTIONS[a], 'price': pr, 'shares': sh}
+            for st, a, pr, sh in zip(
+                self._trade_step[:k].tolist(), self._trade_action[:k].tolist(),
+                self._trade_price[:k].tolist(), self._trade_shares[:k].tolist(),
+            )
+        ]
+
+    def trade_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(step, action, price, shares) views of this episode's trades; action 1 = buy, 2 = sell."""
+        k = self._trade_i
+        return (self._trade_step[:k], self._trade_action[:k],
+                self._trade_price[:k], self._trade_shares[:k])
+
+    @property
+    def portfolio_values(self) -> List[float]:
+        """Portfolio value after each step of the current episode."""
+        return self._pv[:self._pv_i].tolist()
+
     def _get_obs(self) -> np.ndarray:
-        feat = self.features[self.current_step]
-        position = 1.0 if self.shares > 0 else 0.0
-        cash_ratio = self.cash / self.initial_cash
-        pv = self.cash + self.shares * self.prices[self.current_step]
-        pv_ratio = pv / self.initial_cash
-        return np.concatenate([feat, [position, cash_ratio, pv_ratio]]).astype(np.float32)
+        """Write the current observation into the reused float32 buffer and return it."""
+        obs = self._obs_buf
+        obs[:20] = self.features[self.current_step]
+        obs[20] = 1.0 if self.shares > 0 else 0.0
+        obs[21] = self.cash / self.initial_cash
+        obs[22] = (self.cash + self.shares * self.prices[self.current_step]) / self.initial_cash
+        return obs
 
     def step(self, action: int):
-        price = self.prices[self.current_step]
-        prev_value = self.cash + self.shares * price
-
-        # Execute action
-        if action == 1 and self.cash > 0:  # Buy
-            n_shares = int(self.cash * (1 - self.commission) / price)
-            if n_shares > 0:
-                cost = n_shares * price * (1 + self.commission)
-                self.cash -= cost
-                self.shares += n_shares
-                self.trades.append({
-                    'step': int(self.current_step),
-                    'action': 'buy',
-                    'price': float(price),
-                    'shares': int(n_shares),
-                })
-
-        elif action == 2 and self.shares > 0:  # Sell
-            revenue = self.shares * price * (1 - self.commission)
-            self.cash += revenue
-            self.trades.append({
-                'step': int(self.current_step),
-                'action': 'sell',
-                'price': float(price),
-                'shares': int(self.shares),
-            })
-            self.shares = 0
-
-        # Move to next step
-        self.current_step += 1
-
-        if self.current_step >= self.n_steps:
-            # Force sell remaining at end
-            if self.shares > 0:
-                self.cash += self.shares * self.prices[-1] * (1 - self.commission)
-                self.shares = 0
-            terminated = True
-        else:
-            terminated = False
-
-        # Calculate reward: percentage change in portfolio value
-        new_price = self.prices[min(self.current_step, self.n_steps - 1)]
-        new_value = self.cash + self.shares * new_price
-        reward = (new_value - prev_value) / prev_value
-
-        self.portfolio_values.append(float(new_value))
-
-        obs = self._get_obs() if not terminated else np.zeros(23, dtype=np.float32)
-        return obs, float(reward), terminated, False, {}
+        trade_step = self.current_step
+        (self.cash, self.shares, self.current_step, reward, new_value,
+         terminated, trade_action, trade_shares) = _env_step(
+            self.prices, self.features, self.current_step, self.cash, self.shares,
+            int(action), self.commission, self.initial_cash, self._obs_buf,
+        )
+        if trade_action:
+            self._trade_step[self._trade_i] = trade_step
+            self._trade_action[self._trade_i] = trade_action
+            self._trade_price[self._trade_i] = self.prices[trade_step]
+            self._trade_shares[self._trade_i] = trade_shares
+            self._trade_i += 1
+
+        self._pv[self._pv_i] = new_value
+        self._pv_i += 1
+
+        obs = _TERMINAL_OBS if terminated else self._obs_buf
+        return obs, float(reward), bool(terminated), False, {}
 
 
 class DRLTradingEngine:
@@ -163,9 +504,53 @@ class DRLTradingEngine:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.environ.get('FMP_API_KEY')
         self._session = requests.Session()
-
-    def _fetch_prices(self, ticker: str, period_days: int) -> Optional[np.ndarray]:
-        """Fetch historical OHLCV from FMP."""
+        self._session.headers['Accept-Encoding'] = 'gzip, deflate'
+        # Pooled keep-alive connections (sized for _fetch_prices_many) with
+        # retry on transient FMP failures (429 rate limits, 5xx, drops).
+        if URLLIB3_RETRY_AVAILABLE:
+            retry = Retry(
+                total=3, backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        else:
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._session.mount('https://', adapter)
+        # (ticker, day) -> (closes, volumes): repeat simulations of a ticker on
+        # the same day reuse the download instead of another round trip.
+        # Bounded at _PRICE_CACHE_MAXSIZE tickers, oldest insert evicted first.
+        self._price_cache: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self._price_cache_lock = threading.Lock()
+
+    def _fetch_prices(self, ticker: str, period_days: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Fetch historical OHLCV from FMP (cached per ticker per day)."""
+        key = (ticker.upper(), datetime.now().date().isoformat())
+        with self._price_cache_lock:
+            cached = self._price_cache.get(key)
+        if cached is not None:
+            return cached
+        closes, volumes = self._fetch_prices_raw(ticker)
+        if closes is None:
+            return None
+        with self._price_cache_lock:
+            # Entries from previous days are stale — drop them on write
+            self._price_cache = {k: v for k, v in self._price_cache.items() if k[1] == key[1]}
+            while len(self._price_cache) >= _PRICE_CACHE_MAXSIZE:
+                del self._price_cache[next(iter(self._price_cache))]  # oldest insert
+            self._price_cache[key] = (closes, volumes)
+        return closes, volumes
+
+    def _fetch_prices_many(self, tickers: List[str], period_days: int = 756,
+                           max_workers: int = 8) -> Dict[str, Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """Fetch several tickers concurrently (latency ≈ slowest fetch, not the sum)."""
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+            results = pool.map(lambda t: self._fetch_prices(t, period_days), tickers)
+            return dict(zip(tickers, results))
+
+    def _fetch_prices_raw(self, ticker: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Download closes/volumes from FMP (no cache)."""
         try:
             url = "https://financialmodelingprep.com/stable/historical-price-eod/full"
             params = {
@@ -173,13 +558,18 @@ class DRLTradingEngine:
                 'apikey': self.api_key,
             }
             resp = self._session.get(url, params=params, timeout=15)
-            data = resp.json()
+            data = orjson.loads(resp.content) if ORJSON_AVAILABLE else resp.json()
             # FMP returns {"historical": [...]} or a list depending on endpoint
             hist = data.get('historical', data) if isinstance(data, dict) else data
             if isinstance(hist, list) and len(hist) > 50:
-                hist_sorted = sorted(hist, key=lambda x: x.get('date', ''))
-                closes = np.array([d.get('adjClose', d['close']) for d in hist_sorted if 'close' in d])
-                volumes = np.array([d.get('volume', 0) for d in hist_sorted if 'close' in d])
+                bars = [d for d in hist if 'close' in d]
+                order = np.argsort(np.array([d.get('date', '') for d in bars]), kind='stable')
+                closes = np.empty(len(bars), dtype=np.float64)
+                volumes = np.empty(len(bars), dtype=np.float64)
+                for i, j in enumerate(order.tolist()):
+                    d = bars[j]
+                    closes[i] = d.get('adjClose', d['close'])
+                    volumes[i] = d.get('volume') or 0
                 return closes, volumes
         except Exception as e:
             logger.error(f"Failed to fetch {ticker}: {e}")
@@ -187,71 +577,69 @@ class DRLTradingEngine:
 
     def _compute_features(self, prices: np.ndarray, volumes: np.ndarray) -> np.ndarray:
         """Compute 20 technical features from price/volume data."""
+        if NUMBA_AVAILABLE:
+            prices = np.ascontiguousarray(prices, dtype=np.float64)
+            volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+            features = np.zeros((len(prices), 20))
+            _compute_features_jit(prices, volumes, features)
+            return np.nan_to_num(features, nan=0.0, posinf=0.0, neginf=0.0)
+        return self._compute_features_numpy(prices, volumes)
+
+    def _compute_features_numpy(self, prices: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        """Vectorized NumPy twin of _compute_features_jit (used without numba)."""
         n = len(prices)
         features = np.zeros((n, 20))
 
         # Normalized close (z-score over 50-day window)
-        for i in range(50, n):
-            window = prices[i-50:i]
-            features[i, 0] = (prices[i] - window.mean()) / (window.std() + 1e-8)
+        w = _trailing_windows(prices, 50)
+        features[50:, 0] = (prices[50:] - w.mean(axis=1)) / (w.std(axis=1) + 1e-8)
 
         # Normalized volume
-        for i in range(20, n):
-            window = volumes[i-20:i]
-            features[i, 1] = (volumes[i] - window.mean()) / (window.std() + 1e-8)
-
-        # Returns: 1d, 5d, 20d
-        features[1:, 2] = np.diff(np.log(prices + 1e-8))
-        for i in range(5, n):
-            features[i, 3] = np.log(prices[i] / (prices[i-5] + 1e-8))
-        for i in range(20, n):
-            features[i, 4] = np.log(prices[i] / (prices[i-20] + 1e-8))
-
-        # RSI (14-day)
+        w = _trailing_windows(volumes, 20)
+        features[20:, 1] = (volumes[20:] - w.mean(axis=1)) / (w.std(axis=1) + 1e-8)
+
+        # Returns: 1d, 5d, 20d — differences of log prices, computed once
+        log_p = np.log(prices + 1e-8)
+        log_ret = np.diff(log_p)
+        features[1:, 2] = log_ret
+        features[5:, 3] = log_p[5:] - log_p[:-5]
+        features[20:, 4] = log_p[20:] - log_p[:-20]
+
+        # RSI (14-day): bar i uses deltas[i-14:i]
         deltas = np.diff(prices)
-        for i in range(15, n):
-            gains = np.maximum(deltas[i-14:i], 0).mean()
-            losses = np.abs(np.minimum(deltas[i-14:i], 0)).mean()
+        if n > 15:
+            w = sliding_window_view(deltas, 14)[1:]
+            gains = np.maximum(w, 0).mean(axis=1)
+            losses = np.abs(np.minimum(w, 0)).mean(axis=1)
             rs = gains / (losses + 1e-8)
-            features[i, 5] = (rs / (1 + rs) - 0.5) * 2  # normalize to [-1, 1]
+            features[15:, 5] = (rs / (1 + rs) - 0.5) * 2  # normalize to [-1, 1]
 
         # MACD (12, 26, 9)
-        ema12 = self._ema(prices, 12)
-        ema26 = self._ema(prices, 26)
-        macd = ema12 - ema26
-        signal = self._ema(macd, 9)
-        features[:, 6] = (macd - signal) / (prices.std() + 1e-8)
+        features[:, 6] = _macd_all(np.ascontiguousarray(prices, dtype=np.float64)) / (prices.std() + 1e-8)
 
         # Bollinger Band position
-        for i in range(20, n):
-            sma = prices[i-20:i].mean()
-            std = prices[i-20:i].std()
-            features[i, 7] = (prices[i] - sma) / (2 * std + 1e-8)
+        w = _trailing_windows(prices, 20)
+        features[20:, 7] = (prices[20:] - w.mean(axis=1)) / (2 * w.std(axis=1) + 1e-8)
 
         # SMA ratios: close/SMA5, close/SMA10, close/SMA20, close/SMA50
         for period, col in [(5, 8), (10, 9), (20, 10), (50, 11)]:
-            for i in range(period, n):
-                sma = prices[i-period:i].mean()
-                features[i, col] = prices[i] / (sma + 1e-8) - 1
+            features[period:, col] = prices[period:] / (_trailing_mean(prices, period) + 1e-8) - 1
 
-        # Volatility (20-day rolling std of returns)
-        log_ret = np.diff(np.log(prices + 1e-8))
-        for i in range(21, n):
-            features[i, 12] = log_ret[i-20:i].std() * np.sqrt(TRADING_DAYS)
+        # Volatility (20-day rolling std of returns): bar i uses log_ret[i-20:i]
+        if n > 21:
+            features[21:, 12] = sliding_window_view(log_ret, 20)[1:].std(axis=1) * np.sqrt(TRADING_DAYS)
 
         # Volume trend
-        for i in range(10, n):
-            features[i, 13] = volumes[i] / (volumes[i-10:i].mean() + 1e-8) - 1
+        features[10:, 13] = volumes[10:] / (_trailing_mean(volumes, 10) + 1e-8) - 1
 
         # Price momentum (rate of change)
         for period, col in [(5, 14), (10, 15), (20, 16)]:
-            for i in range(period, n):
-                features[i, col] = (prices[i] - prices[i-period]) / (prices[i-period] + 1e-8)
+            features[period:, col] = (prices[period:] - prices[:-period]) / (prices[:-period] + 1e-8)
 
-        # High-low range proxy (using close differences)
-        for i in range(5, n):
-            window = prices[i-5:i+1]
-            features[i, 17] = (window.max() - window.min()) / (window.mean() + 1e-8)
+        # High-low range proxy (using close differences) over prices[i-5:i+1]
+        if n > 5:
+            w = sliding_window_view(prices, 6)
+            features[5:, 17] = (w.max(axis=1) - w.min(axis=1)) / (w.mean(axis=1) + 1e-8)
 
         # Gap feature (overnight gap proxy)
         features[1:, 18] = np.diff(prices) / (prices[:-1] + 1e-8)
@@ -266,55 +654,27 @@ class DRLTradingEngine:
     @staticmethod
     def _ema(data: np.ndarray, period: int) -> np.ndarray:
         """Compute exponential moving average."""
-        ema = np.zeros_like(data, dtype=float)
-        ema[0] = data[0]
-        alpha = 2.0 / (period + 1)
-        for i in range(1, len(data)):
-            ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
-        return ema
+        return _ema_jit(np.ascontiguousarray(data, dtype=np.float64), period)
 
     def _rule_based_fallback(self, prices: np.ndarray, features: np.ndarray) -> Dict[str, Any]:
         """Simple momentum-based fallback when SB3 is not available."""
-        n = len(prices)
-        cash = 10000.0
-        shares = 0
-        trades = []
-        portfolio_values = []
-        actions = []
-
-        for i in range(20, n):
-            pv = cash + shares * prices[i]
-            portfolio_values.append(float(pv))
-
-            rsi_norm = features[i, 5]
-            momentum = features[i, 4]
-
-            if rsi_norm < -0.3 and momentum > 0 and cash > 0:  # Oversold + uptrend → buy
-                n_shares = int(cash * 0.999 / prices[i])
-                if n_shares > 0:
-                    cash -= n_shares * prices[i] * 1.001
-                    shares += n_shares
-                    trades.append({'step': i, 'action': 'buy', 'price': float(prices[i]), 'shares': n_shares})
-                    actions.append(1)
-                else:
-                    actions.append(0)
-            elif rsi_norm > 0.3 and shares > 0:  # Overbought → sell
-                cash += shares * prices[i] * 0.999
-                trades.append({'step': i, 'action': 'sell', 'price': float(prices[i]), 'shares': shares})
-                shares = 0
-                actions.append(2)
-            else:
-                actions.append(0)
-
-        # Close remaining position
-        if shares > 0:
-            cash += shares * prices[-1] * 0.999
-            shares = 0
-
-        final_value = cash
+        rsi_norm = features[20:, 5]
+        momentum = features[20:, 4]
+        buy_sig = (rsi_norm < -0.3) & (momentum > 0)   # Oversold + uptrend → buy
+        sell_sig = rsi_norm > 0.3                      # Overbought → sell
+
+        (actions, portfolio_values, trade_step, trade_action,
+         trade_price, trade_shares, final_value) = _simulate_rule(
+            np.ascontiguousarray(prices, dtype=np.float64), buy_sig, sell_sig, 20, 10000.0,
+        )
+        trades = [
+            {'step': st, 'action': _TRADE_ACTIONS[a], 'price': pr, 'shares': sh}
+            for st, a, pr, sh in zip(trade_step.tolist(), trade_action.tolist(),
+                                     trade_price.tolist(), trade_shares.tolist())
+        ]
         return {
             'trades': trades,
-            'portfolio_values': portfolio_values,
+            'portfolio_values': portfolio_values.tolist(),
             'actions': actions,
             'final_value': float(final_value),
             'method': 'Rule-Based Momentum (fallback)',
@@ -331,7 +691,7 @@ class DRLTradingEngine:
 
         # Fetch data
         result = self._fetch_prices(ticker, period_days)
-        if result[0] is None:
+        if result is None:
             return {'error': f'Could not fetch data for {ticker}'}
 
         prices, volumes = result
@@ -364,7 +724,7 @@ class DRLTradingEngine:
                 'pnl_curve': fallback['portfolio_values'],
                 'benchmark_curve': bh_values,
                 'training_curve': [],
-                'action_distribution': {'hold': fallback['actions'].count(0), 'buy': fallback['actions'].count(1), 'sell': fallback['actions'].count(2)},
+                'action_distribution': _action_counts(fallback['actions']),
                 'metrics': {
                     'total_return': float(agent_return),
                     'benchmark_return': float(bh_return),
@@ -395,12 +755,14 @@ class DRLTradingEngine:
         # Evaluate on test set
         obs, _ = test_env.reset()
         done = False
-        actions = []
+        actions = np.empty(len(test_prices), dtype=np.int8)
+        n_actions = 0
 
         while not done:
             action, _ = model.predict(obs, deterministic=True)
             obs, reward, done, truncated, info = test_env.step(int(action))
-            actions.append(int(action))
+            actions[n_actions] = action
+            n_actions += 1
 
         pnl_curve = test_env.portfolio_values
         trades = test_env.trades
@@ -411,19 +773,22 @@ class DRLTradingEngine:
         pnl_arr = np.array(pnl_curve)
         returns = np.diff(pnl_arr) / pnl_arr[:-1] if len(pnl_arr) > 1 else np.array([0])
         sharpe = float(returns.mean() / (returns.std() + 1e-8) * np.sqrt(TRADING_DAYS)) if len(returns) > 1 else 0
-        max_dd = float(np.max(np.maximum.accumulate(pnl_arr) - pnl_arr) / (np.maximum.accumulate(pnl_arr) + 1e-8).max())
-
-        # Win rate
-        winning_trades = 0
-        for i in range(0, len(trades) - 1, 2):
-            if i + 1 < len(trades):
-                if trades[i]['action'] == 'buy' and trades[i+1]['action'] == 'sell':
-                    if trades[i+1]['price'] > trades[i]['price']:
-                        winning_trades += 1
-        n_round_trips = len(trades) // 2
+        max_dd = _max_drawdown(pnl_arr) if len(pnl_arr) else 0.0
+
+        # Win rate: trades pair up as (0, 1), (2, 3), ...; a pair wins when it is
+        # a buy followed by a sell at a higher price
+        _, trade_action, trade_price, _ = test_env.trade_arrays()
+        n_round_trips = len(trade_action) // 2
+        k = 2 * n_round_trips
+        wins = (
+            (trade_action[0:k:2] == 1)
+            & (trade_action[1:k:2] == 2)
+            & (trade_price[1:k:2] > trade_price[0:k:2])
+        )
+        winning_trades = int(np.count_nonzero(wins))
         win_rate = winning_trades / n_round_trips if n_round_trips > 0 else 0
 
-        action_counts = {'hold': actions.count(0), 'buy': actions.count(1), 'sell': actions.count(2)}
+        action_counts = _action_counts(actions[:n_actions])
 
         return {
             'ticker': ticker,
@@ -451,12 +816,31 @@ class DRLTradingEngine:
             'training_steps': training_steps,
         }
 
+    def simulate_many(self, tickers: List[str], **kwargs) -> Dict[str, Dict[str, Any]]:
+        """
+        simulate() for several tickers. Price histories are prefetched in
+        parallel (warming the per-day cache); training then runs per ticker.
+        """
+        self._fetch_prices_many(tickers, kwargs.get('period_days', 756))
+        return {t: self.simulate(t, **kwargs) for t in tickers}
+
+
+# Pay numba compilation (or cache load) at import instead of on the first request
+if NUMBA_AVAILABLE and os.environ.get('DRL_PRECOMPILE', '1') == '1':
+    try:
+        _warm_jit_kernels()
+    except Exception as e:
+        logger.warning(f"DRL kernel precompile failed, compiling lazily: {e}")
+
 
 # Module-level singleton
 _engine: Optional[DRLTradingEngine] = None
+_engine_lock = threading.Lock()
 
 def get_drl_engine() -> DRLTradingEngine:
     global _engine
     if _engine is None:
-        _engine = DRLTradingEngine()
+        with _engine_lock:
+            if _engine is None:
+                _engine = DRLTradingEngine()
     return _engine
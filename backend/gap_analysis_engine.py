@@ -4,22 +4,37 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import logging
 import os
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 import numpy as np
 
+from _njit import NUMBA_AVAILABLE, njit
+
 try:
     from scipy import stats as scipy_stats
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
@@ -32,9 +47,287 @@ logger = logging.getLogger(__name__)
 _REQUIRED_OHLCV_KEYS = {'date', 'open', 'high', 'low', 'close', 'volume'}
 
 _VALID_DIRECTIONS = {'up', 'down', 'both'}
+_DIRECTION_CODES = {'both': 0, 'up': 1, 'down': 2}
+
+_TRENDS = ('unknown', 'uptrend', 'downtrend', 'sideways')
+_TREND_UNKNOWN, _TREND_UP, _TREND_DOWN, _TREND_SIDEWAYS = range(len(_TRENDS))
+
+# _agg output keys and the decimals each is rounded to
+_AGG_KEYS = ('mean', 'median', 'std', 'min', 'max', 'p25', 'p75')
+_AGG_DECIMALS = (2, 2, 1, 2, 2, 2, 2)
+
+# |gap %| bucket edges for the gap-size analysis (np.digitize: x < 2 → 0, ...)
+_GAP_SIZE_EDGES = np.array([2.0, 5.0, 10.0])
+_GAP_SIZE_BUCKETS = ('0_to_2pct', '2_to_5pct', '5_to_10pct', 'over_10pct')
+
+# Optional analyze() report sections -> the result keys each one fills;
+# callers that only need the gap table skip the rest via `include`
+_SECTION_KEYS = {
+    'stats':               ('stats', 'upStats', 'downStats'),
+    'conditionalProbs':    ('conditionalProbs',),
+    'statSignificance':    ('statSignificance',),
+    'gapSizeAnalysis':     ('gapSizeAnalysis',),
+    'volumeProfileByType': ('volumeProfileByType',),
+}
+_REPORT_SECTIONS = frozenset(_SECTION_KEYS)
+
+_GAP_CLASSES = ('common', 'breakaway', 'exhaustion')
+_GAP_COMMON, _GAP_BREAKAWAY, _GAP_EXHAUSTION = range(len(_GAP_CLASSES))
+
+# Columnar mirror of the per-gap dicts, used for the aggregate statistics.
+# Values are the same rounded numbers the dicts carry; NaN / -1 stand for null.
+_GAP_DTYPE = np.dtype([
+    ('gap_pct', 'f8'), ('hvo', 'f8'), ('lvo', 'f8'), ('cvo', 'f8'),
+    ('vol_ratio', 'f8'), ('next_cvo', 'f8'), ('close', 'f8'), ('prev_close', 'f8'),
+    ('days_to_fill', 'i8'), ('gap_class', 'u1'), ('trend', 'u1'),
+    ('up', '?'), ('green', '?'), ('filled', '?'), ('has_next', '?'), ('next_green', '?'),
+    ('win', '?'),
+])
 
 _FETCH_MAX_RETRIES = 3
-_FETCH_RETRY_DELAY = 1  # seconds
+_FETCH_MAX_WORKERS = 16  # analyze_many fan-out; also the connection pool size
+
+# Process-wide cache of parsed bars keyed by (API-key hash, ticker, date): FMP's
+# daily history only changes once a day, so repeat analyses of a ticker (other
+# days/threshold/direction) skip the HTTP round-trip. The key hash keeps callers
+# with a different (or invalid) key from being served another key's fetch.
+# Entries from previous days are evicted, and past _BARS_CACHE_MAXSIZE tickers
+# the oldest insert goes first.
+_BARS_CACHE: Dict[Tuple[str, str, str], "OHLCV"] = {}
+_BARS_CACHE_LOCK = threading.Lock()
+_BARS_CACHE_MAXSIZE = 512
+
+# Second tier of the same cache on disk (one .npz of columns per key, ticker and day),
+# so process restarts (dev reloads, deploys on a persistent volume) do not
+# re-hit FMP the same day. GAP_CACHE_DIR='' disables it.
+_DISK_CACHE_DIR = os.environ.get(
+    'GAP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.gap_cache')
+)
+_OHLCV_FIELDS = ('dates', 'opens', 'highs', 'lows', 'closes', 'volumes')
+
+# Short-TTL memo of finished analyze() results keyed by (API-key hash, ticker,
+# days, threshold, direction, sections): dashboards re-request the same report
+# many times a day, and on daily bars the answer does not move between refreshes.
+# Callers get deep copies.
+_RESULT_CACHE: Dict[Tuple[str, str, int, float, str, FrozenSet[str]], Tuple[float, Dict[str, Any]]] = {}
+_RESULT_CACHE_LOCK = threading.Lock()
+_RESULT_TTL_SECONDS = 900.0
+_RESULT_CACHE_MAXSIZE = 4096
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _http_session() -> "requests.Session":
+    """Shared keep-alive session for FMP: pooled connections (no TLS handshake
+    per fetch) and urllib3 retries with backoff on transient failures."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                retry = Retry(
+                    total=_FETCH_MAX_RETRIES, backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['GET']),
+                    raise_on_status=False,  # hand back the last response; logged below
+                )
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(
+                    pool_connections=4, pool_maxsize=_FETCH_MAX_WORKERS, max_retries=retry,
+                ))
+                _SESSION = session
+    return _SESSION
+
+
+@dataclass
+class OHLCV:
+    """Daily bars as a Structure of Arrays (oldest first).
+
+    Each field is one contiguous column; missing/None prices and volumes are 0,
+    matching the `float(bar.get(key) or 0)` convention of the per-bar code.
+    """
+    dates: np.ndarray    # datetime64[D]
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def columns(self) -> Tuple[np.ndarray, ...]:
+        return self.dates, self.opens, self.highs, self.lows, self.closes, self.volumes
+
+    def select(self, mask: np.ndarray) -> "OHLCV":
+        """New OHLCV holding the bars picked by a boolean mask or index array."""
+        return OHLCV(*(col[mask] for col in self.columns()))
+
+    @classmethod
+    def from_fmp(cls, bars: List[Dict]) -> "OHLCV":
+        """Build the columns from FMP's raw bar dicts (any order) in one pass.
+
+        Each bar is split-adjusted by adjClose/close (a missing open/high/low
+        defaults to the raw close before scaling) and dropped if it still lacks a
+        required key; the values go straight into preallocated columns, so no
+        adjusted or filtered copy of the dict list is built.
+        """
+        n = len(bars)
+        cols = np.zeros((5, n))
+        dates: List[str] = []
+        m = 0
+        for bar in bars:
+            raw_close = bar.get('close', 0)
+            if raw_close and raw_close > 0:
+                adj_close = bar.get('adjClose', raw_close)
+                ratio = adj_close / raw_close
+                o = bar.get('open', raw_close) * ratio
+                h = bar.get('high', raw_close) * ratio
+                l = bar.get('low', raw_close) * ratio
+                c = adj_close
+                if 'date' not in bar or 'volume' not in bar:
+                    continue
+            else:
+                if not _REQUIRED_OHLCV_KEYS.issubset(bar.keys()):
+                    continue
+                o, h, l, c = bar['open'], bar['high'], bar['low'], raw_close
+            dates.append(bar['date'][:10])
+            cols[:, m] = (o or 0, h or 0, l or 0, c or 0, bar['volume'] or 0)
+            m += 1
+
+        ohlcv = cls(np.array(dates, dtype='datetime64[D]'), *cols[:, :m])
+        # FMP returns newest first, so the usual case is an O(n) reversal; any
+        # other order falls back to a stable argsort on the date column
+        d = ohlcv.dates
+        if (d[1:] < d[:-1]).all():
+            return ohlcv.select(np.arange(m - 1, -1, -1))  # contiguous copies
+        if (d[1:] >= d[:-1]).all():
+            return ohlcv
+        return ohlcv.select(np.argsort(d, kind='stable'))
+
+
+def _disk_cache_path(key_hash: str, ticker: str, day: str) -> Optional[str]:
+    """Path of the on-disk bars for (key_hash, ticker, day), or None when disabled."""
+    if not _DISK_CACHE_DIR or os.sep in ticker or ticker.startswith('.'):
+        return None
+    return os.path.join(_DISK_CACHE_DIR, f"{ticker}_{key_hash}_{day}.npz")
+
+
+def _load_bars_from_disk(key_hash: str, ticker: str, day: str) -> Optional[OHLCV]:
+    path = _disk_cache_path(key_hash, ticker, day)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as npz:
+            return OHLCV(*(npz[f] for f in _OHLCV_FIELDS))
+    except Exception as e:
+        logger.warning("[GapEngine] ignoring unreadable bars cache %s: %s", path, e)
+        return None
+
+
+def _save_bars_to_disk(key_hash: str, ticker: str, day: str, bars: OHLCV) -> None:
+    """Write atomically (temp file + rename) and drop every cached file from an
+    older day, so tickers that are never requested again don't pile up."""
+    path = _disk_cache_path(key_hash, ticker, day)
+    if path is None:
+        return
+    try:
+        os.makedirs(_DISK_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **dict(zip(_OHLCV_FIELDS, bars.columns())))
+        os.replace(tmp, path)
+        for name in os.listdir(_DISK_CACHE_DIR):
+            if name.endswith('.npz') and name[:-len('.npz')].rsplit('_', 1)[-1] != day:
+                try:
+                    os.remove(os.path.join(_DISK_CACHE_DIR, name))
+                except FileNotFoundError:
+                    pass  # another worker cleaned it up first
+    except OSError as e:
+        logger.warning("[GapEngine] could not write bars cache %s: %s", path, e)
+
+
+def _sorted_percentile(srt: List[float], q: float) -> float:
+    """np.percentile(x, 100 * q) for an already sorted x, using NumPy's 'linear'
+    interpolation (including its lerp form) so results match bit for bit."""
+    pos = q * (len(srt) - 1)
+    lo = int(pos)
+    t = pos - lo
+    a = srt[lo]
+    b = srt[min(lo + 1, len(srt) - 1)]
+    d = b - a
+    return b - d * (1 - t) if t >= 0.5 else a + d * t
+
+
+def _round_col(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Python round() applied over a column. np.round scales by 10**ndigits and can
+    land on the other side of a .5 tie, so reported figures keep round()'s result."""
+    return np.array([round(v, ndigits) for v in values.tolist()], dtype=np.float64)
+
+
+@njit(cache=True)
+def _scan_gaps_jit(opens, highs, lows, closes, thr, direction):
+    """
+    Compiled gap scan (twin of GapAnalysisEngine._scan_gaps_numpy). `direction`
+    is a _DIRECTION_CODES value. Returns per-gap arrays (bar_index, is_up,
+    gap_pct, filled_same_day, days_to_fill [-1 = never], reversal_next_day).
+    """
+    n = len(closes)
+    idx = np.empty(n, dtype=np.int64)
+    up = np.empty(n, dtype=np.bool_)
+    pct = np.empty(n, dtype=np.float64)
+    filled = np.empty(n, dtype=np.bool_)
+    dtf = np.empty(n, dtype=np.int64)
+    rev = np.empty(n, dtype=np.bool_)
+    m = 0
+    for i in range(1, n):
+        pc = closes[i - 1]
+        o = opens[i]
+        if pc <= 0 or o <= 0:
+            continue
+        g = (o - pc) / pc
+        is_up = g >= thr
+        if direction == 1:
+            take = is_up
+        elif direction == 2:
+            take = g <= -thr
+        else:
+            take = is_up or g <= -thr
+        if not take:
+            continue
+
+        idx[m] = i
+        up[m] = is_up
+        pct[m] = g
+        filled[m] = lows[i] <= pc if is_up else highs[i] >= pc
+        d = -1
+        for j in range(i, n):
+            if closes[j] <= pc if is_up else closes[j] >= pc:
+                d = j - i
+                break
+        dtf[m] = d
+        rev[m] = i + 1 < n and (closes[i + 1] < o if is_up else closes[i + 1] > o)
+        m += 1
+    return idx[:m], up[:m], pct[:m], filled[:m], dtf[:m], rev[:m]
+
+
+def _warm_jit_kernels() -> None:
+    """
+    Compile the gap scan once on tiny inputs with the dtypes analyze() passes
+    (C-contiguous float64 columns, float threshold, int direction code), so the
+    first gap request doesn't pay numba's JIT cost. With cache=True this is a
+    disk load after the first process has run.
+    """
+    prices = np.linspace(100.0, 110.0, 32)
+    _scan_gaps_jit(prices, prices, prices, prices, 0.02, _DIRECTION_CODES['both'])
+
+
+# Pay numba compilation (or cache load) at import instead of on the first request
+if NUMBA_AVAILABLE and os.environ.get('GAP_PRECOMPILE', '1') == '1':
+    try:
+        _warm_jit_kernels()
+    except Exception as e:
+        logger.warning("Gap scan precompile failed, compiling lazily: %s", e)
 
 
 class GapAnalysisEngine:
@@ -44,66 +337,77 @@ class GapAnalysisEngine:
         if not api_key:
             raise ValueError("A valid FMP API key is required")
         self.api_key = api_key
+        # Cache-key component: results and bars are only shared between callers
+        # using the same key (the key itself never lands in a cache filename)
+        self._key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
 
     # ------------------------------------------------------------------
     # Data fetching (with retries)
     # ------------------------------------------------------------------
-    def _fetch_historical_ohlcv(self, ticker: str, days: int) -> List[Dict]:
-        """Fetch daily OHLCV from FMP stable API with retry logic."""
+    def _fetch_historical_ohlcv(self, ticker: str, days: int) -> Optional[OHLCV]:
+        """Fetch daily OHLCV from FMP stable API (retries handled by the session).
+
+        Returns split-adjusted, valid bars as an OHLCV, or None on failure or when
+        FMP returned fewer than 10 bars.
+        """
         if not REQUESTS_AVAILABLE:
             logger.warning("requests library not available — cannot fetch data")
-            return []
+            return None
 
         url = (
             f"https://financialmodelingprep.com/stable/historical-price-eod/full"
             f"?symbol={ticker}&apikey={self.api_key}"
         )
 
-        last_err: Optional[Exception] = None
-        for attempt in range(1, _FETCH_MAX_RETRIES + 1):
-            try:
-                logger.info("[GapEngine] Fetching historical data for %s (attempt %d/%d)...",
-                            ticker, attempt, _FETCH_MAX_RETRIES)
-                resp = requests.get(url, timeout=20)
-                if not resp.ok:
-                    logger.error("[GapEngine] FMP error %s for %s", resp.status_code, ticker)
-                    last_err = RuntimeError(f"HTTP {resp.status_code}")
-                    if attempt < _FETCH_MAX_RETRIES:
-                        time.sleep(_FETCH_RETRY_DELAY)
-                    continue
+        try:
+            logger.info("[GapEngine] Fetching historical data for %s...", ticker)
+            resp = _http_session().get(url, timeout=(3, 20))
+            if not resp.ok:
+                logger.error("[GapEngine] FMP error %s for %s", resp.status_code, ticker)
+                return None
 
-                data = resp.json()
-                hist = data.get('historical', []) if isinstance(data, dict) else data
-                if not hist:
-                    logger.warning("[GapEngine] No historical data returned for %s", ticker)
-                    return []
-
-                logger.info("[GapEngine] Got %d raw bars for %s", len(hist), ticker)
-                # FMP returns newest first — sort ascending (oldest first)
-                hist = sorted(hist, key=lambda x: x.get('date', ''))
-
-                # Adjust OHLC for splits using adjClose
-                for bar in hist:
-                    raw_close = bar.get('close', 0)
-                    adj_close = bar.get('adjClose', raw_close)
-                    if raw_close and raw_close > 0:
-                        ratio = adj_close / raw_close
-                        bar['open'] = bar.get('open', raw_close) * ratio
-                        bar['high'] = bar.get('high', raw_close) * ratio
-                        bar['low'] = bar.get('low', raw_close) * ratio
-                        bar['close'] = adj_close
-
-                return hist
-
-            except Exception as e:
-                last_err = e
-                logger.error("[GapEngine] fetch error (attempt %d): %s", attempt, e)
-                if attempt < _FETCH_MAX_RETRIES:
-                    time.sleep(_FETCH_RETRY_DELAY)
-
-        logger.error("[GapEngine] All %d fetch attempts failed. Last error: %s",
-                     _FETCH_MAX_RETRIES, last_err)
-        return []
+            data = orjson.loads(resp.content) if ORJSON_AVAILABLE else resp.json()
+            del resp  # drop the raw body before building the columns
+            hist = data.get('historical', []) if isinstance(data, dict) else data
+            if not hist:
+                logger.warning("[GapEngine] No historical data returned for %s", ticker)
+                return None
+
+            logger.info("[GapEngine] Got %d raw bars for %s", len(hist), ticker)
+            if len(hist) < 10:
+                return None
+            return OHLCV.from_fmp(hist)
+
+        except Exception as e:
+            logger.error("[GapEngine] fetch error for %s: %s", ticker, e)
+            return None
+
+    def _get_bars(self, ticker: str, days: int) -> Optional[OHLCV]:
+        """Valid bars for `ticker` as a read-only OHLCV, served from the daily cache
+        (memory, then disk) when possible. Returns None when FMP returned fewer
+        than 10 bars."""
+        key = (self._key_hash, ticker, date.today().isoformat())
+        with _BARS_CACHE_LOCK:
+            bars = _BARS_CACHE.get(key)
+        if bars is not None:
+            return bars
+
+        bars = _load_bars_from_disk(*key)
+        if bars is None:
+            bars = self._fetch_historical_ohlcv(ticker, days)
+            if bars is None:
+                return None
+            _save_bars_to_disk(*key, bars)
+        for col in bars.columns():
+            col.setflags(write=False)  # shared across requests
+
+        with _BARS_CACHE_LOCK:
+            for stale in [k for k in _BARS_CACHE if k[-1] != key[-1]]:
+                del _BARS_CACHE[stale]
+            while len(_BARS_CACHE) >= _BARS_CACHE_MAXSIZE:
+                del _BARS_CACHE[next(iter(_BARS_CACHE))]  # oldest insert
+            _BARS_CACHE[key] = bars
+        return bars
 
     # ------------------------------------------------------------------
     # Input validation
@@ -132,113 +436,147 @@ class GapAnalysisEngine:
     # Helpers
     # ------------------------------------------------------------------
     @staticmethod
-    def _bar_is_valid(bar: Dict) -> bool:
-        """Check that a bar dict contains all required keys."""
-        return _REQUIRED_OHLCV_KEYS.issubset(bar.keys())
+    def _agg(values) -> Dict:
+        """Aggregate statistics including percentiles (list or array column).
 
-    @staticmethod
-    def _agg(lst: List[float]) -> Dict:
-        """Aggregate statistics including percentiles."""
-        if not lst:
-            return {"mean": None, "median": None, "std": None,
-                    "min": None, "max": None, "p25": None, "p75": None}
-        arr = np.array(lst)
-        return {
-            "mean":   round(float(np.mean(arr)), 2),
-            "median": round(float(np.median(arr)), 2),
-            "std":    round(float(np.std(arr)), 1),
-            "min":    round(float(np.min(arr)), 2),
-            "max":    round(float(np.max(arr)), 2),
-            "p25":    round(float(np.percentile(arr, 25)), 2),
-            "p75":    round(float(np.percentile(arr, 75)), 2),
-        }
+        The order statistics (min, max, median, p25, p75) all come from one sort;
+        only mean and std are separate reductions.
+        """
+        arr = np.asarray(values, dtype=np.float64)
+        if not arr.size:
+            return dict.fromkeys(_AGG_KEYS)
+        srt = np.sort(arr).tolist()
+        n = len(srt)
+        mid = n // 2
+        median = srt[mid] if n % 2 else (srt[mid - 1] + srt[mid]) / 2
+        stats = (float(arr.mean()), median, float(arr.std()), srt[0], srt[-1],
+                 _sorted_percentile(srt, 0.25), _sorted_percentile(srt, 0.75))
+        return {k: round(v, d) for k, v, d in zip(_AGG_KEYS, stats, _AGG_DECIMALS)}
 
     # ------------------------------------------------------------------
     # Gap classification
     # ------------------------------------------------------------------
     @staticmethod
-    def _classify_gap(
-        abs_gap_pct: float,
-        volume: float,
-        avg_volume_20: float,
-        reversal_next_day: bool,
-    ) -> str:
-        """Classify gap as common, breakaway, or exhaustion.
+    def _classify_gaps(
+        abs_gap_pct: np.ndarray,
+        volume: np.ndarray,
+        avg_volume_20: np.ndarray,
+        reversal_next_day: np.ndarray,
+    ) -> np.ndarray:
+        """Classify gaps as common, breakaway, or exhaustion (codes into _GAP_CLASSES).
 
         - common:    |gap| < 5%
         - breakaway: |gap| >= 5% AND volume > 1.5x 20-day avg
         - exhaustion: followed by a same-day or next-day reversal
         """
-        if reversal_next_day:
-            return "exhaustion"
-        if abs_gap_pct >= 5.0 and avg_volume_20 > 0 and volume > 1.5 * avg_volume_20:
-            return "breakaway"
-        return "common"
+        breakaway = (abs_gap_pct >= 5.0) & (avg_volume_20 > 0) & (volume > 1.5 * avg_volume_20)
+        return np.where(
+            reversal_next_day, _GAP_EXHAUSTION,
+            np.where(breakaway, _GAP_BREAKAWAY, _GAP_COMMON),
+        ).astype(np.uint8)
 
     @staticmethod
-    def _compute_sma(hist: List[Dict], end_index: int, window: int = 20) -> Optional[float]:
-        """Compute simple moving average of close prices over `window` bars ending at end_index (exclusive)."""
-        start = max(0, end_index - window)
-        closes = []
-        for j in range(start, end_index):
-            c = float(hist[j].get('close') or 0)
-            if c > 0:
-                closes.append(c)
-        if len(closes) < window // 2:
-            return None
-        return float(np.mean(closes))
+    def _trailing_mean(values: np.ndarray, window: int = 20) -> np.ndarray:
+        """Mean of the positive entries of values[max(0, e - window):e] for every
+        end index e in 0..n (NaN where the window holds none).
 
-    @staticmethod
-    def _determine_trend_context(hist: List[Dict], index: int, window: int = 20) -> str:
-        """Determine if the gap occurred in an uptrend or downtrend using SMA direction.
-
-        Compares the 20-day SMA at `index` vs SMA at `index - 5` to determine slope.
+        One cumulative-sum pass over the series replaces re-scanning a window per
+        bar; zeros (missing data) are excluded exactly as the per-bar code did.
         """
-        if index < window + 5:
-            return "unknown"
-        closes_recent = [float(hist[j].get('close') or 0) for j in range(index - window, index)]
-        closes_earlier = [float(hist[j].get('close') or 0) for j in range(index - window - 5, index - 5)]
-        closes_recent = [c for c in closes_recent if c > 0]
-        closes_earlier = [c for c in closes_earlier if c > 0]
-        if not closes_recent or not closes_earlier:
-            return "unknown"
-        sma_now = np.mean(closes_recent)
-        sma_prev = np.mean(closes_earlier)
-        if sma_now > sma_prev * 1.001:
-            return "uptrend"
-        elif sma_now < sma_prev * 0.999:
-            return "downtrend"
-        return "sideways"
+        pos = values > 0
+        csum = np.concatenate(([0.0], np.cumsum(np.where(pos, values, 0.0))))
+        ccnt = np.concatenate(([0], np.cumsum(pos)))
+        start = np.maximum(np.arange(len(csum)) - window, 0)
+        counts = ccnt - ccnt[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (csum - csum[start]) / counts
 
     @staticmethod
-    def _compute_avg_volume(hist: List[Dict], end_index: int, window: int = 20) -> float:
-        """Compute average volume over `window` bars ending *before* end_index."""
-        start = max(0, end_index - window)
-        vols = []
-        for j in range(start, end_index):
-            v = float(hist[j].get('volume') or 0)
-            if v > 0:
-                vols.append(v)
-        return float(np.mean(vols)) if vols else 0.0
+    def _trend_context_codes(sma: np.ndarray, window: int = 20) -> np.ndarray:
+        """Trend context code (index into _TRENDS) for every bar, from SMA direction.
+
+        Compares the trailing SMA at each index vs the SMA 5 bars earlier; `sma`
+        is the _trailing_mean of closes. Bars before window + 5, or whose SMA
+        windows hold no prices, are "unknown".
+        """
+        codes = np.zeros(len(sma), dtype=np.uint8)
+        sma_now = sma[window + 5:]
+        sma_prev = sma[window:-5]
+        codes[window + 5:] = np.select(
+            [np.isnan(sma_now) | np.isnan(sma_prev),
+             sma_now > sma_prev * 1.001,
+             sma_now < sma_prev * 0.999],
+            [_TREND_UNKNOWN, _TREND_UP, _TREND_DOWN],
+            default=_TREND_SIDEWAYS,
+        )
+        return codes
 
     @staticmethod
     def _compute_days_to_fill(
-        gap_type: str,
-        prev_close: float,
-        hist: List[Dict],
-        start_index: int,
-    ) -> Optional[int]:
-        """Count trading days until the gap is filled (close crosses prev_close).
-
-        Returns None if the gap was never filled within the available data.
+        gap_index: np.ndarray,
+        gap_up: np.ndarray,
+        prev_close: np.ndarray,
+        closes: np.ndarray,
+    ) -> np.ndarray:
+        """Count trading days until each gap is filled (close crosses its prev_close),
+        searching from the gap bar onward.
+
+        All gaps are resolved together: a (gaps × bars) crossing mask restricted to
+        j >= gap_index, reduced with argmax to the first hit. Rows are processed in
+        blocks to bound memory. Returns -1 where the gap was never filled within the
+        available data.
         """
-        for offset, j in enumerate(range(start_index, len(hist)), start=0):
-            bar_close = float(hist[j].get('close') or 0)
-            if gap_type == 'up' and bar_close <= prev_close:
-                return offset
-            if gap_type == 'down' and bar_close >= prev_close:
-                return offset
-        return None
+        n = len(closes)
+        out = np.full(len(gap_index), -1, dtype=np.int64)
+        cols = np.arange(n)
+        block = max(1, (1 << 20) // max(n, 1))
+        for lo in range(0, len(gap_index), block):
+            idx = gap_index[lo:lo + block, None]
+            level = prev_close[lo:lo + block, None]
+            crossed = np.where(gap_up[lo:lo + block, None], closes <= level, closes >= level)
+            crossed &= cols >= idx
+            first = crossed.argmax(axis=1)
+            hit = crossed[np.arange(len(first)), first]
+            out[lo:lo + block] = np.where(hit, first - idx[:, 0], -1)
+        return out
+
+    @classmethod
+    def _scan_gaps_numpy(
+        cls,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        thr: float,
+        direction: int,
+    ) -> Tuple[np.ndarray, ...]:
+        """Vectorized NumPy twin of _scan_gaps_jit (used without numba)."""
+        # Candidate gap bars 1..n-1: index k ↔ bar k+1
+        prev_closes = closes[:-1]
+        gap_opens = opens[1:]
+        priced = (prev_closes > 0) & (gap_opens > 0)
+        gap_pct = np.divide(gap_opens - prev_closes, prev_closes,
+                            out=np.zeros(len(prev_closes)), where=priced)
+        is_up = priced & (gap_pct >= thr)
+        is_down = priced & (gap_pct <= -thr)
+        mask = is_up if direction == 1 else is_down if direction == 2 else is_up | is_down
+
+        k = np.flatnonzero(mask)
+        idx = k + 1
+        up = is_up[k]
+        prev_close = prev_closes[k]
+
+        # Gap filled same-day: price returned to prev_close
+        filled = np.where(up, lows[idx] <= prev_close, highs[idx] >= prev_close)
+
+        # Reversal: next close back through the gap-day open
+        nxt = np.minimum(idx + 1, len(closes) - 1)
+        reversal = (idx + 1 < len(closes)) & np.where(
+            up, closes[nxt] < opens[idx], closes[nxt] > opens[idx]
+        )
+
+        days_to_fill = cls._compute_days_to_fill(idx, up, prev_close, closes)
+        return idx, up, gap_pct[k], filled, days_to_fill, reversal
 
     # ------------------------------------------------------------------
     # Core analysis
@@ -249,6 +587,7 @@ class GapAnalysisEngine:
         days: int = 600,
         gap_threshold_pct: float = 2.0,
         direction: str = 'both',
+        include: Optional[Iterable[str]] = None,
     ) -> Dict[str, Any]:
         """Find historical gaps and compute behavioral statistics.
 
@@ -266,133 +605,114 @@ class GapAnalysisEngine:
           - daysToFill: trading days until gap filled (null if unfilled)
 
         For the day AFTER a gap we also track OHLC relative to gap open.
+
+        `include` limits the report sections computed (see _REPORT_SECTIONS);
+        None or {'all'} computes everything, and skipped sections are None.
+        The gap counts and recentGaps are always returned.
         """
         # --- Validation ---
         validation_err = self._validate_inputs(ticker, days, gap_threshold_pct, direction)
         if validation_err:
             return validation_err
+        if include is None or 'all' in include:
+            sections = _REPORT_SECTIONS
+        else:
+            sections = frozenset(include)
+            unknown = sections - _REPORT_SECTIONS
+            if unknown:
+                return {"error": f"include must be 'all' or a subset of {sorted(_REPORT_SECTIONS)}, "
+                                 f"got {sorted(unknown)}"}
 
         days = int(days)
+        key = (self._key_hash, ticker, days, gap_threshold_pct, direction, sections)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+
+        result = self._analyze(ticker, days, gap_threshold_pct, direction, sections)
+        if "error" not in result:
+            now = time.monotonic()
+            with _RESULT_CACHE_LOCK:
+                for stale in [k for k, v in _RESULT_CACHE.items() if now - v[0] >= _RESULT_TTL_SECONDS]:
+                    del _RESULT_CACHE[stale]
+                while len(_RESULT_CACHE) >= _RESULT_CACHE_MAXSIZE:
+                    del _RESULT_CACHE[next(iter(_RESULT_CACHE))]  # oldest insert
+                _RESULT_CACHE[key] = (now, result)
+            result = copy.deepcopy(result)
+        return result
 
-        hist = self._fetch_historical_ohlcv(ticker, days)
-        if len(hist) < 10:
-            return {"error": f"Insufficient historical data for {ticker}"}
-
-        # Filter out bars with missing required keys
-        hist = [h for h in hist if self._bar_is_valid(h)]
-
-        # Trim to requested days
-        cutoff_date = datetime.now() - timedelta(days=days)
-        hist = [h for h in hist if datetime.strptime(h['date'][:10], '%Y-%m-%d') >= cutoff_date]
-
-        if len(hist) < 5:
-            return {"error": "Not enough data within the requested date range"}
-
-        thr = gap_threshold_pct / 100.0
-        gaps: List[Dict] = []
-
-        for i in range(1, len(hist)):
-            prev = hist[i - 1]
-            curr = hist[i]
-            next_day = hist[i + 1] if i + 1 < len(hist) else None
-
-            prev_close = float(prev.get('close') or 0)
-            curr_open  = float(curr.get('open')  or 0)
-            curr_high  = float(curr.get('high')  or 0)
-            curr_low   = float(curr.get('low')   or 0)
-            curr_close = float(curr.get('close') or 0)
-            curr_vol   = float(curr.get('volume') or 0)
-
-            if prev_close <= 0 or curr_open <= 0:
-                continue
+    @staticmethod
+    def _cached_result(key: Tuple) -> Optional[Dict[str, Any]]:
+        """Fresh cached result for `key` as a deep copy, else None.
 
-            gap_pct = (curr_open - prev_close) / prev_close
+        A full report cached under the same parameters also serves any subset
+        of sections (the extra sections blanked), so e.g. get_active_gaps after
+        a dashboard analyze() reuses that pass.
+        """
+        sections = key[-1]
+        now = time.monotonic()
+        with _RESULT_CACHE_LOCK:
+            for cand in (key, key[:-1] + (_REPORT_SECTIONS,)):
+                hit = _RESULT_CACHE.get(cand)
+                if hit is not None and now - hit[0] < _RESULT_TTL_SECONDS:
+                    break
+            else:
+                return None
 
-            is_gap_up   = gap_pct >= thr
-            is_gap_down = gap_pct <= -thr
+        result = copy.deepcopy(hit[1])
+        for section in _REPORT_SECTIONS - sections:
+            for k in _SECTION_KEYS[section]:
+                if k in result:
+                    result[k] = None
+        return result
 
-            if direction == 'up'   and not is_gap_up:   continue
-            if direction == 'down' and not is_gap_down: continue
-            if direction == 'both' and not (is_gap_up or is_gap_down): continue
+    def analyze_recent(
+        self,
+        ticker: str,
+        days: int = 600,
+        gap_threshold_pct: float = 2.0,
+        direction: str = 'both',
+    ) -> Dict[str, Any]:
+        """Gap counts and the recent-gaps table only: scan plus the last 50 rows,
+        without any of the aggregate report sections."""
+        return self.analyze(ticker, days, gap_threshold_pct, direction, include=())
 
-            gap_type = 'up' if is_gap_up else 'down'
+    def _analyze(
+        self,
+        ticker: str,
+        days: int,
+        gap_threshold_pct: float,
+        direction: str,
+        sections: FrozenSet[str] = _REPORT_SECTIONS,
+    ) -> Dict[str, Any]:
+        """Uncached body of analyze() for validated inputs."""
+        bars = self._get_bars(ticker, days)
+        if bars is None:
+            return {"error": f"Insufficient historical data for {ticker}"}
 
-            # Same-day behavior (relative to open = 0 baseline)
-            high_vs_open  = (curr_high  - curr_open) / curr_open if curr_open > 0 else 0
-            low_vs_open   = (curr_low   - curr_open) / curr_open if curr_open > 0 else 0
-            close_vs_open = (curr_close - curr_open) / curr_open if curr_open > 0 else 0
+        # Trim to requested days (bar dates are midnight; the cutoff keeps its time of day)
+        cutoff = np.datetime64(datetime.now() - timedelta(days=days), 'us')
+        bars = bars.select(bars.dates >= cutoff)
 
-            # Green day: close > open (regardless of gap direction)
-            green_day = curr_close > curr_open
+        if len(bars) < 5:
+            return {"error": "Not enough data within the requested date range"}
 
-            # Gap filled same-day: price returned to prev_close
-            gap_filled = False
-            if gap_type == 'up':
-                gap_filled = curr_low <= prev_close
-            else:
-                gap_filled = curr_high >= prev_close
-
-            # Volume vs 20-day average
-            avg_vol_20 = self._compute_avg_volume(hist, i)
-            volume_vs_avg = round(curr_vol / avg_vol_20, 2) if avg_vol_20 > 0 else None
-
-            # Days to fill (searching from the gap day onward)
-            days_to_fill = self._compute_days_to_fill(gap_type, prev_close, hist, i)
-
-            # Determine reversal for gap classification
-            reversal_next_day = False
-            if next_day:
-                n_close = float(next_day.get('close') or 0)
-                if gap_type == 'up' and n_close < curr_open:
-                    reversal_next_day = True
-                elif gap_type == 'down' and n_close > curr_open:
-                    reversal_next_day = True
-
-            gap_class = self._classify_gap(
-                abs(gap_pct * 100), curr_vol, avg_vol_20, reversal_next_day
-            )
+        # Structure-of-Arrays view of the bars; everything below indexes columns
+        dates, opens, highs, lows, closes, volumes = bars.columns()
+        n_bars = len(bars)
 
-            # Trend context (uptrend / downtrend / sideways / unknown)
-            trend_ctx = self._determine_trend_context(hist, i)
+        thr = gap_threshold_pct / 100.0
 
-            # Day after stats
-            next_stats = None
-            if next_day:
-                n_open  = float(next_day.get('open')  or 0)
-                n_close = float(next_day.get('close') or 0)
-                n_high  = float(next_day.get('high')  or 0)
-                n_low   = float(next_day.get('low')   or 0)
-                if n_open > 0:
-                    next_stats = {
-                        "highVsOpen":  round((n_high  - n_open) / n_open * 100, 2),
-                        "lowVsOpen":   round((n_low   - n_open) / n_open * 100, 2),
-                        "closeVsOpen": round((n_close - n_open) / n_open * 100, 2),
-                        "greenDay":    n_close > n_open,
-                    }
-
-            gaps.append({
-                "date":         curr['date'][:10],
-                "type":         gap_type,
-                "gapClass":     gap_class,
-                "trendContext": trend_ctx,
-                "prevClose":    round(prev_close, 2),
-                "open":         round(curr_open, 2),
-                "high":         round(curr_high, 2),
-                "low":          round(curr_low, 2),
-                "close":        round(curr_close, 2),
-                "volume":       int(curr_vol),
-                "volumeVsAvg":  volume_vs_avg,
-                "gapPct":       round(gap_pct * 100, 2),
-                "highVsOpen":   round(high_vs_open  * 100, 2),
-                "lowVsOpen":    round(low_vs_open   * 100, 2),
-                "closeVsOpen":  round(close_vs_open * 100, 2),
-                "greenDay":     green_day,
-                "gapFilled":    gap_filled,
-                "daysToFill":   days_to_fill,
-                "nextDay":      next_stats,
-            })
+        # --- Gap scan: one row per gap (bar index, direction, size, fill, reversal) ---
+        # Invariant: bars are date-ascending and the scan emits gaps in bar order,
+        # so `rows` is in ascending date order — "most recent" is a tail slice
+        scan = _scan_gaps_jit if NUMBA_AVAILABLE else self._scan_gaps_numpy
+        (gap_idx, gap_up_arr, gap_pct_arr, filled_arr,
+         days_to_fill_arr, reversal_arr) = scan(opens, highs, lows, closes, thr,
+                                                _DIRECTION_CODES[direction])
+        n_gaps = len(gap_idx)
 
-        if not gaps:
+        if not n_gaps:
             return {
                 "ticker": ticker,
                 "days": days,
@@ -402,105 +722,102 @@ class GapAnalysisEngine:
                 "upGaps": 0,
                 "downGaps": 0,
                 "gaps": [],
+                "activeGaps": [],
                 "stats": None,
                 "message": f"No gaps found >={gap_threshold_pct}% in the last {days} days",
             }
 
-        # -- Aggregate statistics --
-        up_gaps   = [g for g in gaps if g['type'] == 'up']
-        down_gaps = [g for g in gaps if g['type'] == 'down']
-
-        def compute_stats(gap_list: List[Dict]) -> Optional[Dict]:
-            if not gap_list:
-                return None
-            n = len(gap_list)
-            green_days  = sum(1 for g in gap_list if g['greenDay'])
-            filled_days = sum(1 for g in gap_list if g['gapFilled'])
-            unfilled_count = n - filled_days
-            next_green  = sum(1 for g in gap_list if g['nextDay'] and g['nextDay']['greenDay'])
-            next_n      = sum(1 for g in gap_list if g['nextDay'] is not None)
-
-            # Win rate: for gap-up, win = close > prev_close; for gap-down, win = close < prev_close
-            wins = 0
-            for g in gap_list:
-                if g['type'] == 'up' and g['close'] > g['prevClose']:
-                    wins += 1
-                elif g['type'] == 'down' and g['close'] < g['prevClose']:
-                    wins += 1
-            win_rate = round(wins / n * 100, 1)
-
-            # Days-to-fill stats (only for filled gaps)
-            fill_days_list = [g['daysToFill'] for g in gap_list if g['daysToFill'] is not None]
-
-            # Gap class distribution
-            class_counts = {}
-            for g in gap_list:
-                cls = g['gapClass']
-                class_counts[cls] = class_counts.get(cls, 0) + 1
-
-            # --- Volume profile by filled vs unfilled ---
-            filled_vols = [g['volumeVsAvg'] for g in gap_list if g['gapFilled'] and g['volumeVsAvg'] is not None]
-            unfilled_vols = [g['volumeVsAvg'] for g in gap_list if not g['gapFilled'] and g['volumeVsAvg'] is not None]
-            volume_profile = {
-                "filledAvgVolumeRatio":   round(float(np.mean(filled_vols)), 2) if filled_vols else None,
-                "unfilledAvgVolumeRatio": round(float(np.mean(unfilled_vols)), 2) if unfilled_vols else None,
-            }
-
-            # --- Unfilled gap bias note ---
-            # Recent unfilled gaps bias fill_rate downward because they haven't had time to fill yet.
-            # We flag this when >20% of unfilled gaps are from the most recent quarter of data.
-            recent_quarter = sorted(gap_list, key=lambda g: g['date'], reverse=True)[:max(1, n // 4)]
-            recent_unfilled = sum(1 for g in recent_quarter if not g['gapFilled'])
-            fill_rate_bias_warning = (
-                unfilled_count > 0 and recent_unfilled / max(unfilled_count, 1) > 0.5
-            )
+        # Same-day behavior relative to open, for every bar (0 where open <= 0);
+        # bar i+1's row doubles as the "next day" stats of a gap on bar i
+        has_open = opens > 0
+        hvo_arr = np.divide(highs - opens, opens, out=np.zeros(n_bars), where=has_open)
+        lvo_arr = np.divide(lows - opens, opens, out=np.zeros(n_bars), where=has_open)
+        cvo_arr = np.divide(closes - opens, opens, out=np.zeros(n_bars), where=has_open)
+        green_arr = closes > opens
+
+        # Trailing 20-bar averages for every bar, in one cumulative-sum pass each
+        avg_vol_arr = np.nan_to_num(self._trailing_mean(volumes, 20))
+        trend_codes = self._trend_context_codes(self._trailing_mean(closes, 20))
+
+        # --- Gap rows, filled column by column (values rounded as they are reported) ---
+        gap_vol = volumes[gap_idx]
+        gap_avg_vol = avg_vol_arr[gap_idx]
+        next_idx = np.minimum(gap_idx + 1, n_bars - 1)
+        # Day after a gap: needs a following bar with a usable open
+        has_next = (gap_idx + 1 < n_bars) & has_open[next_idx]
+
+        rows = np.zeros(n_gaps, dtype=_GAP_DTYPE)
+        rows['gap_pct'] = _round_col(gap_pct_arr * 100, 2)
+        rows['hvo'] = _round_col(hvo_arr[gap_idx] * 100, 2)
+        rows['lvo'] = _round_col(lvo_arr[gap_idx] * 100, 2)
+        rows['cvo'] = _round_col(cvo_arr[gap_idx] * 100, 2)
+        rows['vol_ratio'] = _round_col(np.divide(
+            gap_vol, gap_avg_vol, out=np.full(n_gaps, np.nan), where=gap_avg_vol > 0), 2)
+        rows['next_cvo'] = np.where(has_next, _round_col(cvo_arr[next_idx] * 100, 2), np.nan)
+        rows['close'] = _round_col(closes[gap_idx], 2)
+        rows['prev_close'] = _round_col(closes[gap_idx - 1], 2)
+        rows['days_to_fill'] = days_to_fill_arr
+        rows['gap_class'] = self._classify_gaps(
+            np.abs(gap_pct_arr * 100), gap_vol, gap_avg_vol, reversal_arr,
+        )
+        rows['trend'] = trend_codes[gap_idx]
+        rows['up'] = gap_up_arr
+        rows['green'] = green_arr[gap_idx]
+        rows['filled'] = filled_arr
+        rows['has_next'] = has_next
+        rows['next_green'] = has_next & green_arr[next_idx]
 
-            return {
-                "count":            n,
-                "greenDayPct":      round(green_days  / n * 100, 1),
-                "redDayPct":        round((n - green_days) / n * 100, 1),
-                "fillRatePct":      round(filled_days / n * 100, 1),
-                "unfilledCount":    unfilled_count,
-                "fillRateBiasWarning": fill_rate_bias_warning,
-                "winRate":          win_rate,
-                "nextDayGreenPct":  round(next_green / next_n * 100, 1) if next_n > 0 else None,
-                "gapPct":           self._agg([g['gapPct']       for g in gap_list]),
-                "highVsOpen":       self._agg([g['highVsOpen']   for g in gap_list]),
-                "lowVsOpen":        self._agg([g['lowVsOpen']    for g in gap_list]),
-                "closeVsOpen":      self._agg([g['closeVsOpen']  for g in gap_list]),
-                "nextCloseVsOpen":  self._agg([g['nextDay']['closeVsOpen'] for g in gap_list if g['nextDay']]),
-                "daysToFill":       self._agg(fill_days_list),
-                "gapClassCounts":   class_counts,
-                "volumeProfile":    volume_profile,
-            }
+        # -- Aggregate statistics --
+        n_up = int(np.count_nonzero(rows['up']))
 
-        all_stats  = compute_stats(gaps)
-        up_stats   = compute_stats(up_gaps)
-        down_stats = compute_stats(down_gaps)
+        all_stats = up_stats = down_stats = None
+        if 'stats' in sections:
+            # Win: for gap-up, close > prev_close; for gap-down, close < prev_close
+            rows['win'] = np.where(rows['up'], rows['close'] > rows['prev_close'],
+                                   rows['close'] < rows['prev_close'])
+            all_stats  = self._group_stats(rows, slice(None))
+            up_stats   = self._group_stats(rows, rows['up'])
+            down_stats = self._group_stats(rows, ~rows['up'])
 
         # --- Conditional probabilities ---
-        conditional_probs = self._compute_conditional_probs(gaps, up_gaps, down_gaps)
+        conditional_probs = None
+        if 'conditionalProbs' in sections:
+            conditional_probs = self._compute_conditional_probs(rows)
 
         # --- Statistical significance (t-test: gap-up returns vs gap-down returns) ---
-        stat_significance = self._compute_stat_significance(up_gaps, down_gaps)
+        stat_significance = None
+        if 'statSignificance' in sections:
+            stat_significance = self._compute_stat_significance(rows)
 
         # --- Gap size analysis (clustering by size buckets) ---
-        gap_size_analysis = self._compute_gap_size_analysis(gaps)
+        gap_size_analysis = None
+        if 'gapSizeAnalysis' in sections:
+            gap_size_analysis = self._compute_gap_size_analysis(rows)
 
         # --- Volume profile by gap type ---
-        volume_profile_by_type = self._compute_volume_profile_by_type(up_gaps, down_gaps)
-
-        # Limit gaps returned to most recent 50 for the table
-        recent_gaps = sorted(gaps, key=lambda x: x['date'], reverse=True)[:50]
+        volume_profile_by_type = None
+        if 'volumeProfileByType' in sections:
+            volume_profile_by_type = self._compute_volume_profile_by_type(rows)
+
+        # Limit gaps returned to most recent 50 for the table; only these become dicts
+        recent = np.arange(n_gaps - 1, max(n_gaps - 50, 0) - 1, -1)
+        recent_gaps = self._gap_records(
+            rows[recent], gap_idx[recent], bars, hvo_arr, lvo_arr, cvo_arr, green_arr,
+        )
+        # Every unfilled gap (not just those in the 50-row table), newest first
+        active = np.flatnonzero(~rows['filled'] & (rows['days_to_fill'] < 0))[::-1]
+        active_gaps = self._active_gap_records(
+            rows[active], dates[gap_idx[active]], opens[gap_idx[active]],
+        )
 
         return {
             "ticker":              ticker,
             "days":                days,
             "gapThresholdPct":     gap_threshold_pct,
             "direction":           direction,
-            "totalGaps":           len(gaps),
-            "upGaps":              len(up_gaps),
-            "downGaps":            len(down_gaps),
+            "totalGaps":           n_gaps,
+            "upGaps":              n_up,
+            "downGaps":            n_gaps - n_up,
             "stats":               all_stats,
             "upStats":             up_stats,
             "downStats":           down_stats,
@@ -509,74 +826,239 @@ class GapAnalysisEngine:
             "gapSizeAnalysis":     gap_size_analysis,
             "volumeProfileByType": volume_profile_by_type,
             "recentGaps":          recent_gaps,
+            "activeGaps":          active_gaps,
         }
 
+    # ------------------------------------------------------------------
+    # Gap records (response rows)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _gap_records(
+        rows: np.ndarray,
+        bar_idx: np.ndarray,
+        bars: OHLCV,
+        hvo_arr: np.ndarray,
+        lvo_arr: np.ndarray,
+        cvo_arr: np.ndarray,
+        green_arr: np.ndarray,
+    ) -> List[Dict]:
+        """Build the per-gap response dicts for the given gap rows (in the given order).
+
+        Each column is converted to Python scalars with one ``tolist()``; the
+        per-bar arrays supply the raw OHLCV values and next-day behavior.
+        """
+        idx = bar_idx.tolist()
+        dates = bars.dates[bar_idx].astype(str).tolist()
+        opens = bars.opens[bar_idx].tolist()
+        highs = bars.highs[bar_idx].tolist()
+        lows = bars.lows[bar_idx].tolist()
+        volumes = bars.volumes[bar_idx].tolist()
+        cols = {name: rows[name].tolist() for name in rows.dtype.names}
+
+        records = []
+        for k, i in enumerate(idx):
+            # Day after stats
+            next_stats = None
+            if cols['has_next'][k]:
+                next_stats = {
+                    "highVsOpen":  round(float(hvo_arr[i + 1]) * 100, 2),
+                    "lowVsOpen":   round(float(lvo_arr[i + 1]) * 100, 2),
+                    "closeVsOpen": cols['next_cvo'][k],
+                    "greenDay":    cols['next_green'][k],
+                }
+            vol_ratio = cols['vol_ratio'][k]
+            days_to_fill = cols['days_to_fill'][k]
+
+            records.append({
+                "date":         dates[k],
+                "type":         'up' if cols['up'][k] else 'down',
+                "gapClass":     _GAP_CLASSES[cols['gap_class'][k]],
+                "trendContext": _TRENDS[cols['trend'][k]],
+                "prevClose":    cols['prev_close'][k],
+                "open":         round(opens[k], 2),
+                "high":         round(highs[k], 2),
+                "low":          round(lows[k], 2),
+                "close":        cols['close'][k],
+                "volume":       int(volumes[k]),
+                "volumeVsAvg":  None if vol_ratio != vol_ratio else vol_ratio,  # NaN = no average
+                "gapPct":       cols['gap_pct'][k],
+                "highVsOpen":   cols['hvo'][k],
+                "lowVsOpen":    cols['lvo'][k],
+                "closeVsOpen":  cols['cvo'][k],
+                "greenDay":     cols['green'][k],
+                "gapFilled":    cols['filled'][k],
+                "daysToFill":   days_to_fill if days_to_fill >= 0 else None,
+                "nextDay":      next_stats,
+            })
+        return records
+
+    @staticmethod
+    def _active_gap_records(rows: np.ndarray, dates: np.ndarray, opens: np.ndarray) -> List[Dict]:
+        """Support/resistance records for unfilled gap rows (in the given order).
+
+        The gap zone spans prevClose to the gap-day open; both bounds are taken
+        branch-free over the columns.
+        """
+        date_strs = dates.astype(str).tolist()
+        open_col = _round_col(opens, 2)
+        zone_low = np.minimum(rows['prev_close'], open_col).tolist()
+        zone_high = np.maximum(rows['prev_close'], open_col).tolist()
+        cols = {name: rows[name].tolist()
+                for name in ('up', 'gap_class', 'trend', 'gap_pct', 'vol_ratio')}
+
+        records = []
+        for k, is_up in enumerate(cols['up']):
+            vol_ratio = cols['vol_ratio'][k]
+            records.append({
+                "date":        date_strs[k],
+                "type":        'up' if is_up else 'down',
+                "gapClass":    _GAP_CLASSES[cols['gap_class'][k]],
+                "trendContext": _TRENDS[cols['trend'][k]],
+                "gapPct":      cols['gap_pct'][k],
+                "gapZoneLow":  zone_low[k],
+                "gapZoneHigh": zone_high[k],
+                "volumeVsAvg": None if vol_ratio != vol_ratio else vol_ratio,  # NaN = no average
+                "levelType":   "support" if is_up else "resistance",
+            })
+        return records
+
+    # ------------------------------------------------------------------
+    # Group statistics
+    # ------------------------------------------------------------------
+    def _group_stats(self, rows: np.ndarray, sel) -> Optional[Dict]:
+        """Summary statistics for the gap rows selected by ``sel`` (mask or slice).
+
+        all/up/down stats are three calls over the same structured array, each
+        reducing masked column views instead of re-walking per-gap dicts.
+        """
+        r = rows[sel]
+        n = len(r)
+        if not n:
+            return None
+        filled = r['filled']
+        green_days  = int(np.count_nonzero(r['green']))
+        filled_days = int(np.count_nonzero(filled))
+        unfilled_count = n - filled_days
+        next_green  = int(np.count_nonzero(r['next_green']))
+        next_n      = int(np.count_nonzero(r['has_next']))
+
+        wins = int(np.count_nonzero(r['win']))
+        win_rate = round(wins / n * 100, 1)
+
+        # Days-to-fill stats (only for filled gaps)
+        days_to_fill = r['days_to_fill']
+        fill_days = days_to_fill[days_to_fill >= 0]
+
+        # Gap class distribution (keys in order of first appearance)
+        codes = r['gap_class']
+        counts = np.bincount(codes, minlength=len(_GAP_CLASSES)).tolist()
+        present = sorted((c for c in range(len(_GAP_CLASSES)) if counts[c]),
+                         key=lambda c: int(np.argmax(codes == c)))
+        class_counts = {_GAP_CLASSES[c]: counts[c] for c in present}
+
+        # --- Volume profile by filled vs unfilled ---
+        vol_ratio = r['vol_ratio']
+        has_vol = ~np.isnan(vol_ratio)
+        filled_vols = vol_ratio[has_vol & filled]
+        unfilled_vols = vol_ratio[has_vol & ~filled]
+        volume_profile = {
+            "filledAvgVolumeRatio":   round(float(np.mean(filled_vols)), 2) if filled_vols.size else None,
+            "unfilledAvgVolumeRatio": round(float(np.mean(unfilled_vols)), 2) if unfilled_vols.size else None,
+        }
+
+        # --- Unfilled gap bias note ---
+        # Recent unfilled gaps bias fill_rate downward because they haven't had time to fill yet.
+        # We flag this when >20% of unfilled gaps are from the most recent quarter of data.
+        recent_unfilled = int(np.count_nonzero(~filled[-max(1, n // 4):]))
+        fill_rate_bias_warning = (
+            unfilled_count > 0 and recent_unfilled / max(unfilled_count, 1) > 0.5
+        )
+
+        return {
+            "count":            n,
+            "greenDayPct":      round(green_days  / n * 100, 1),
+            "redDayPct":        round((n - green_days) / n * 100, 1),
+            "fillRatePct":      round(filled_days / n * 100, 1),
+            "unfilledCount":    unfilled_count,
+            "fillRateBiasWarning": fill_rate_bias_warning,
+            "winRate":          win_rate,
+            "nextDayGreenPct":  round(next_green / next_n * 100, 1) if next_n > 0 else None,
+            "gapPct":           self._agg(r['gap_pct']),
+            "highVsOpen":       self._agg(r['hvo']),
+            "lowVsOpen":        self._agg(r['lvo']),
+            "closeVsOpen":      self._agg(r['cvo']),
+            "nextCloseVsOpen":  self._agg(r['next_cvo'][r['has_next']]),
+            "daysToFill":       self._agg(fill_days),
+            "gapClassCounts":   class_counts,
+            "volumeProfile":    volume_profile,
+        }
+
+    def analyze_many(
+        self,
+        tickers: List[str],
+        days: int = 600,
+        gap_threshold_pct: float = 2.0,
+        direction: str = 'both',
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run analyze() for several tickers, fetching concurrently over the shared session."""
+        if not tickers:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(_FETCH_MAX_WORKERS, len(tickers))) as pool:
+            results = pool.map(
+                lambda t: self.analyze(t, days, gap_threshold_pct, direction), tickers,
+            )
+            return dict(zip(tickers, results))
+
     # ------------------------------------------------------------------
     # Conditional probabilities
     # ------------------------------------------------------------------
     @staticmethod
-    def _compute_conditional_probs(
-        all_gaps: List[Dict],
-        up_gaps: List[Dict],
-        down_gaps: List[Dict],
-    ) -> Dict[str, Any]:
+    def _compute_conditional_probs(rows: np.ndarray) -> Dict[str, Any]:
         """Compute conditional probabilities for key gap behaviors.
 
         Returns probabilities like P(green_day | gap_up > 5%), P(fill_same_day | gap_up), etc.
+        `rows` is the structured gaps array; every condition is a boolean column mask
+        and every count a popcount over an AND of masks.
         """
         def safe_pct(numerator: int, denominator: int) -> Optional[float]:
             return round(numerator / denominator * 100, 1) if denominator > 0 else None
 
-        # P(green_day | gap_up)
-        up_green = sum(1 for g in up_gaps if g['greenDay'])
-        # P(green_day | gap_down)
-        down_green = sum(1 for g in down_gaps if g['greenDay'])
-
-        # P(green_day | gap_up > 5%)
-        big_up = [g for g in up_gaps if g['gapPct'] > 5.0]
-        big_up_green = sum(1 for g in big_up if g['greenDay'])
-
-        # P(green_day | gap_down > 5%)
-        big_down = [g for g in down_gaps if g['gapPct'] < -5.0]
-        big_down_green = sum(1 for g in big_down if g['greenDay'])
-
-        # P(fill_same_day | gap_up)
-        up_filled = sum(1 for g in up_gaps if g['gapFilled'])
-        # P(fill_same_day | gap_down)
-        down_filled = sum(1 for g in down_gaps if g['gapFilled'])
-
-        # P(fill_same_day | gap in uptrend)
-        uptrend_gaps = [g for g in all_gaps if g['trendContext'] == 'uptrend']
-        uptrend_filled = sum(1 for g in uptrend_gaps if g['gapFilled'])
-        # P(fill_same_day | gap in downtrend)
-        downtrend_gaps = [g for g in all_gaps if g['trendContext'] == 'downtrend']
-        downtrend_filled = sum(1 for g in downtrend_gaps if g['gapFilled'])
-
-        # P(next_day_green | gap_up)
-        up_next_green = sum(1 for g in up_gaps if g['nextDay'] and g['nextDay']['greenDay'])
-        up_with_next = sum(1 for g in up_gaps if g['nextDay'] is not None)
-        # P(next_day_green | gap_down)
-        down_next_green = sum(1 for g in down_gaps if g['nextDay'] and g['nextDay']['greenDay'])
-        down_with_next = sum(1 for g in down_gaps if g['nextDay'] is not None)
+        def count(mask: np.ndarray) -> int:
+            return int(np.count_nonzero(mask))
+
+        up = rows['up']
+        down = ~up
+        green = rows['green']
+        filled = rows['filled']
+        has_next = rows['has_next']
+        next_green = rows['next_green']
+        big_up = up & (rows['gap_pct'] > 5.0)
+        big_down = down & (rows['gap_pct'] < -5.0)
+        uptrend = rows['trend'] == _TREND_UP
+        downtrend = rows['trend'] == _TREND_DOWN
+
+        n_up, n_down = count(up), count(down)
+        n_big_up, n_big_down = count(big_up), count(big_down)
+        n_uptrend, n_downtrend = count(uptrend), count(downtrend)
 
         return {
-            "P_green_given_gap_up":           safe_pct(up_green, len(up_gaps)),
-            "P_green_given_gap_down":         safe_pct(down_green, len(down_gaps)),
-            "P_green_given_gap_up_gt5pct":    safe_pct(big_up_green, len(big_up)),
-            "P_green_given_gap_down_gt5pct":  safe_pct(big_down_green, len(big_down)),
-            "P_fill_same_day_given_gap_up":   safe_pct(up_filled, len(up_gaps)),
-            "P_fill_same_day_given_gap_down": safe_pct(down_filled, len(down_gaps)),
-            "P_fill_given_uptrend":           safe_pct(uptrend_filled, len(uptrend_gaps)),
-            "P_fill_given_downtrend":         safe_pct(downtrend_filled, len(downtrend_gaps)),
-            "P_next_green_given_gap_up":      safe_pct(up_next_green, up_with_next),
-            "P_next_green_given_gap_down":    safe_pct(down_next_green, down_with_next),
+            "P_green_given_gap_up":           safe_pct(count(green & up), n_up),
+            "P_green_given_gap_down":         safe_pct(count(green & down), n_down),
+            "P_green_given_gap_up_gt5pct":    safe_pct(count(green & big_up), n_big_up),
+            "P_green_given_gap_down_gt5pct":  safe_pct(count(green & big_down), n_big_down),
+            "P_fill_same_day_given_gap_up":   safe_pct(count(filled & up), n_up),
+            "P_fill_same_day_given_gap_down": safe_pct(count(filled & down), n_down),
+            "P_fill_given_uptrend":           safe_pct(count(filled & uptrend), n_uptrend),
+            "P_fill_given_downtrend":         safe_pct(count(filled & downtrend), n_downtrend),
+            "P_next_green_given_gap_up":      safe_pct(count(next_green & up), count(has_next & up)),
+            "P_next_green_given_gap_down":    safe_pct(count(next_green & down), count(has_next & down)),
             "sample_sizes": {
-                "up_gaps":        len(up_gaps),
-                "down_gaps":      len(down_gaps),
-                "big_up_gaps":    len(big_up),
-                "big_down_gaps":  len(big_down),
-                "uptrend_gaps":   len(uptrend_gaps),
-                "downtrend_gaps": len(downtrend_gaps),
+                "up_gaps":        n_up,
+                "down_gaps":      n_down,
+                "big_up_gaps":    n_big_up,
+                "big_down_gaps":  n_big_down,
+                "uptrend_gaps":   n_uptrend,
+                "downtrend_gaps": n_downtrend,
             },
         }
 
@@ -584,10 +1066,7 @@ class GapAnalysisEngine:
     # Statistical significance (t-test)
     # ------------------------------------------------------------------
     @staticmethod
-    def _compute_stat_significance(
-        up_gaps: List[Dict],
-        down_gaps: List[Dict],
-    ) -> Dict[str, Any]:
+    def _compute_stat_significance(rows: np.ndarray) -> Dict[str, Any]:
         """Use Welch's t-test to determine if gap-up day returns differ
         significantly from gap-down day returns.
 
@@ -596,8 +1075,9 @@ class GapAnalysisEngine:
         if not SCIPY_AVAILABLE:
             return {"error": "scipy not available for statistical tests"}
 
-        up_returns = [g['closeVsOpen'] for g in up_gaps]
-        down_returns = [g['closeVsOpen'] for g in down_gaps]
+        up = rows['up']
+        up_returns = rows['cvo'][up]
+        down_returns = rows['cvo'][~up]
 
         if len(up_returns) < 3 or len(down_returns) < 3:
             return {
@@ -612,8 +1092,8 @@ class GapAnalysisEngine:
             "t_statistic":      round(float(t_stat), 4),
             "p_value":          round(float(p_val), 6),
             "significant":      bool(p_val < 0.05),
-            "up_mean_return":   round(float(np.mean(up_returns)), 2),
-            "down_mean_return": round(float(np.mean(down_returns)), 2),
+            "up_mean_return":   round(float(up_returns.mean()), 2),
+            "down_mean_return": round(float(down_returns.mean()), 2),
             "up_n":             len(up_returns),
             "down_n":           len(down_returns),
         }
@@ -621,48 +1101,35 @@ class GapAnalysisEngine:
     # ------------------------------------------------------------------
     # Gap size analysis (clustering by size buckets)
     # ------------------------------------------------------------------
-    def _compute_gap_size_analysis(self, gaps: List[Dict]) -> Dict[str, Any]:
+    def _compute_gap_size_analysis(self, rows: np.ndarray) -> Dict[str, Any]:
         """Group gaps into size buckets and compute stats per bucket.
 
-        Buckets: 0-2%, 2-5%, 5-10%, >10% (using absolute gap %).
+        Buckets: 0-2%, 2-5%, 5-10%, >10% (using absolute gap %), assigned to every
+        gap at once with np.digitize.
         """
-        buckets = {
-            "0_to_2pct":   [],
-            "2_to_5pct":   [],
-            "5_to_10pct":  [],
-            "over_10pct":  [],
-        }
-
-        for g in gaps:
-            abs_pct = abs(g['gapPct'])
-            if abs_pct < 2.0:
-                buckets["0_to_2pct"].append(g)
-            elif abs_pct < 5.0:
-                buckets["2_to_5pct"].append(g)
-            elif abs_pct < 10.0:
-                buckets["5_to_10pct"].append(g)
-            else:
-                buckets["over_10pct"].append(g)
+        abs_pct = np.abs(rows['gap_pct'])
+        bucket = np.digitize(abs_pct, _GAP_SIZE_EDGES)
+        counts = np.bincount(bucket, minlength=len(_GAP_SIZE_BUCKETS))
 
         result = {}
-        for bucket_name, bucket_gaps in buckets.items():
-            n = len(bucket_gaps)
+        for k, bucket_name in enumerate(_GAP_SIZE_BUCKETS):
+            n = int(counts[k])
             if n == 0:
                 result[bucket_name] = {"count": 0}
                 continue
 
-            green_n = sum(1 for g in bucket_gaps if g['greenDay'])
-            filled_n = sum(1 for g in bucket_gaps if g['gapFilled'])
-            fill_days = [g['daysToFill'] for g in bucket_gaps if g['daysToFill'] is not None]
+            sel = bucket == k
+            r = rows[sel]
+            fill_days = r['days_to_fill'][r['days_to_fill'] >= 0]
 
             result[bucket_name] = {
                 "count":       n,
-                "greenDayPct": round(green_n / n * 100, 1),
-                "fillRatePct": round(filled_n / n * 100, 1),
-                "avgGapPct":   round(float(np.mean([abs(g['gapPct']) for g in bucket_gaps])), 2),
-                "avgReturn":   round(float(np.mean([g['closeVsOpen'] for g in bucket_gaps])), 2),
-                "avgDaysToFill": round(float(np.mean(fill_days)), 1) if fill_days else None,
-                "gapPctStats": self._agg([g['gapPct'] for g in bucket_gaps]),
+                "greenDayPct": round(int(np.count_nonzero(r['green'])) / n * 100, 1),
+                "fillRatePct": round(int(np.count_nonzero(r['filled'])) / n * 100, 1),
+                "avgGapPct":   round(float(np.mean(abs_pct[sel])), 2),
+                "avgReturn":   round(float(np.mean(r['cvo'])), 2),
+                "avgDaysToFill": round(float(np.mean(fill_days)), 1) if fill_days.size else None,
+                "gapPctStats": self._agg(r['gap_pct']),
             }
 
         return result
@@ -671,27 +1138,23 @@ class GapAnalysisEngine:
     # Volume profile by gap type
     # ------------------------------------------------------------------
     @staticmethod
-    def _compute_volume_profile_by_type(
-        up_gaps: List[Dict],
-        down_gaps: List[Dict],
-    ) -> Dict[str, Any]:
+    def _compute_volume_profile_by_type(rows: np.ndarray) -> Dict[str, Any]:
         """Average volume ratio broken down by gap type and fill status."""
-        def avg_vol_ratio(gap_list: List[Dict]) -> Optional[float]:
-            vols = [g['volumeVsAvg'] for g in gap_list if g['volumeVsAvg'] is not None]
-            return round(float(np.mean(vols)), 2) if vols else None
+        vol_ratio = rows['vol_ratio']
+        has_vol = ~np.isnan(vol_ratio)
+        up, filled = rows['up'], rows['filled']
 
-        up_filled = [g for g in up_gaps if g['gapFilled']]
-        up_unfilled = [g for g in up_gaps if not g['gapFilled']]
-        down_filled = [g for g in down_gaps if g['gapFilled']]
-        down_unfilled = [g for g in down_gaps if not g['gapFilled']]
+        def avg_vol_ratio(mask: np.ndarray) -> Optional[float]:
+            vols = vol_ratio[has_vol & mask]
+            return round(float(vols.mean()), 2) if vols.size else None
 
         return {
-            "upGapAvgVolumeRatio":            avg_vol_ratio(up_gaps),
-            "downGapAvgVolumeRatio":          avg_vol_ratio(down_gaps),
-            "upFilledAvgVolumeRatio":         avg_vol_ratio(up_filled),
-            "upUnfilledAvgVolumeRatio":       avg_vol_ratio(up_unfilled),
-            "downFilledAvgVolumeRatio":       avg_vol_ratio(down_filled),
-            "downUnfilledAvgVolumeRatio":     avg_vol_ratio(down_unfilled),
+            "upGapAvgVolumeRatio":            avg_vol_ratio(up),
+            "downGapAvgVolumeRatio":          avg_vol_ratio(~up),
+            "upFilledAvgVolumeRatio":         avg_vol_ratio(up & filled),
+            "upUnfilledAvgVolumeRatio":       avg_vol_ratio(up & ~filled),
+            "downFilledAvgVolumeRatio":       avg_vol_ratio(~up & filled),
+            "downUnfilledAvgVolumeRatio":     avg_vol_ratio(~up & ~filled),
         }
 
     # ------------------------------------------------------------------
@@ -710,31 +1173,11 @@ class GapAnalysisEngine:
         Each active gap includes the gap zone (prevClose to open) which acts as a
         magnetic zone the price may revisit.
         """
-        result = self.analyze(ticker, days, gap_threshold_pct, direction)
+        result = self.analyze_recent(ticker, days, gap_threshold_pct, direction)
         if 'error' in result:
             return result
 
-        all_gaps = result.get('recentGaps', [])
-        # Also check all gaps from the full analysis (recentGaps is capped at 50)
-        # We need to re-analyze to get the full list, but we can use recentGaps
-        # since unfilled gaps are more likely to be recent anyway.
-
-        active = []
-        for g in all_gaps:
-            if not g['gapFilled'] and g['daysToFill'] is None:
-                gap_zone_low = min(g['prevClose'], g['open'])
-                gap_zone_high = max(g['prevClose'], g['open'])
-                active.append({
-                    "date":        g['date'],
-                    "type":        g['type'],
-                    "gapClass":    g['gapClass'],
-                    "trendContext": g['trendContext'],
-                    "gapPct":      g['gapPct'],
-                    "gapZoneLow":  round(gap_zone_low, 2),
-                    "gapZoneHigh": round(gap_zone_high, 2),
-                    "volumeVsAvg": g['volumeVsAvg'],
-                    "levelType":   "resistance" if g['type'] == 'down' else "support",
-                })
+        active = result.get('activeGaps', [])
 
         return {
             "ticker":     ticker,
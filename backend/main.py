@@ -2,6 +2,23 @@
 # FastAPI server for AdvanceValue Net & CompanyQuality Net
 
 import os as _os
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Logging goes through a queue; a background listener thread does the actual
+# stdout writes so handlers never block the event loop. The handler sits on the
+# root logger so engine module loggers (WARNING and up by default) share it;
+# "stockapi" is this module's logger with its own LOG_LEVEL.
+logger = logging.getLogger("stockapi")
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_stream, respect_handler_level=True)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 
 def _load_env_files() -> None:
@@ -29,41 +46,91 @@ def _load_env_files() -> None:
                     if key and key not in _os.environ:
                         _os.environ[key] = val
         except Exception as e:  # noqa: BLE001
-            print(f"[env] could not read {path}: {e}")
+            logger.warning("[env] could not read %s: %s", path, e)
 
 
 _load_env_files()
+logger.setLevel(_os.environ.get("LOG_LEVEL", "INFO").upper())  # WARNING in production
+FMP_API_KEY = _os.environ.get("FMP_API_KEY")  # read once, after the .env files
 
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
 import numpy as np
 import json
 import os
+import time
+from datetime import date
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _numpy_default(obj):
+    """Convert numpy scalars/arrays the JSON encoders don't handle natively."""
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    if isinstance(obj, (np.floating,)):
+        return float(obj)
+    if isinstance(obj, (np.bool_,)):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class NumpySafeEncoder(json.JSONEncoder):
     """JSON encoder that handles numpy types."""
     def default(self, obj):
-        if isinstance(obj, (np.integer,)):
-            return int(obj)
-        if isinstance(obj, (np.floating,)):
-            return float(obj)
-        if isinstance(obj, (np.bool_,)):
-            return bool(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
+        try:
+            return _numpy_default(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+class NumpySafeJSONResponse(JSONResponse):
+    """Default response class: orjson (numpy scalars and arrays serialized
+    natively, in one pass) when available, else stdlib json + NumpySafeEncoder."""
+    def render(self, content: Any) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                content,
+                default=_numpy_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(
+            content, cls=NumpySafeEncoder, ensure_ascii=False, allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+def _log_exception(msg: str, *args: Any) -> None:
+    """Log a handled endpoint failure from inside an except block.
+
+    The stack trace is attached up to INFO level (local/dev); with LOG_LEVEL set to
+    WARNING or above only the message is logged, so an error storm does not
+    format a full traceback per failed request.
+    """
+    logger.error(msg, *args, exc_info=logger.isEnabledFor(logging.INFO))
+
+
+def _float_array(values: List[Optional[float]]) -> np.ndarray:
+    """Request float list as a float64 array with None (and NaN) mapped to 0."""
+    arr = np.array(values, dtype=np.float64)  # None -> nan
+    arr[np.isnan(arr)] = 0.0
+    return arr
 
 
 def numpy_safe_response(data: Any) -> JSONResponse:
     """Return a JSONResponse that safely handles numpy types."""
-    content = json.loads(json.dumps(data, cls=NumpySafeEncoder))
-    return JSONResponse(content=content)
+    return NumpySafeJSONResponse(content=data)
 
-from model import predictor
+from model import predictor, valid_expert_values, MIN_VALID_EXPERTS
 from quality_model import quality_predictor
 from neural_resumen_engine import neural_engine
 from earnings_prediction_engine import predict_earnings_outcome
@@ -255,7 +322,8 @@ except ImportError:
 app = FastAPI(
     title="Stock Analysis AI API",
     description="Neural Ensemble for Stock Valuation & Company Quality Assessment",
-    version="1.1.0"
+    version="1.1.0",
+    default_response_class=NumpySafeJSONResponse,
 )
 
 # CORS - allow requests from Next.js frontend
@@ -275,15 +343,14 @@ class PredictionRequest(BaseModel):
     expert_valuations: list[Optional[float]]  # Values from DDM, DCF, etc.
     tabular_features: list[Optional[float]]   # ROE, margins, growth rates, etc.
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "ticker": "AAPL",
-                "current_price": 175.50,
-                "expert_valuations": [180.5, 165.2, 190.0, 172.3, 185.0, None, 168.9],
-                "tabular_features": [0.15, 0.25, 0.08, 1.2, 0.45, 0.12]
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "ticker": "AAPL",
+            "current_price": 175.50,
+            "expert_valuations": [180.5, 165.2, 190.0, 172.3, 185.0, None, 168.9],
+            "tabular_features": [0.15, 0.25, 0.08, 1.2, 0.45, 0.12]
         }
+    })
 
 
 class PredictionResponse(BaseModel):
@@ -323,14 +390,13 @@ class QualityRequest(BaseModel):
     features: List[Optional[float]]  # ~45 financial metrics
     industry: str = "Unknown"
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "ticker": "AAPL",
-                "features": [0.15, 0.08, 0.12, 0.25, 0.30, 0.22],
-                "industry": "Consumer Electronics"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "ticker": "AAPL",
+            "features": [0.15, 0.08, 0.12, 0.25, 0.30, 0.22],
+            "industry": "Consumer Electronics"
         }
+    })
 
 
 class QualityResponse(BaseModel):
@@ -359,10 +425,10 @@ async def predict_quality(request: QualityRequest):
     """
     try:
         # Clean features (replace None with 0)
-        features = [v if v is not None else 0 for v in request.features]
+        features = _float_array(request.features)
 
         # Get prediction
-        result = quality_predictor.predict(features=features)
+        result = await asyncio.to_thread(quality_predictor.predict, features=features)
 
         return QualityResponse(
             ticker=request.ticker,
@@ -373,6 +439,181 @@ async def predict_quality(request: QualityRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class _CoalescingCache:
+    """
+    TTL cache for async endpoint results with request coalescing: a hit is a
+    dict lookup, and concurrent misses for one key await one shared task.
+    Only successful results are stored; an exception reaches every waiter.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._results: Dict[Tuple, Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple, "asyncio.Task"] = {}
+
+    async def get(self, key: Tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        hit = self._results.get(key)
+        if hit is not None and time.monotonic() - hit[0] < self.ttl:
+            return hit[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(compute())
+            task.add_done_callback(lambda t: self._store(key, t))
+            self._inflight[key] = task
+        # shield: a disconnecting client must not cancel a computation others await
+        return await asyncio.shield(task)
+
+    def _store(self, key: Tuple, task: "asyncio.Task") -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        now = time.monotonic()
+        for stale in [k for k, v in self._results.items() if now - v[0] >= self.ttl]:
+            del self._results[stale]
+        while len(self._results) >= self.maxsize:
+            del self._results[next(iter(self._results))]  # oldest insert
+        self._results[key] = (now, task.result())
+
+
+class _PredictBatcher:
+    """
+    Micro-batcher for /advancevalue/predict: requests that arrive within
+    `max_delay` seconds of the first queued one (up to `max_batch`) share one
+    predictor.predict_batch call, i.e. one network forward pass, run off the
+    event loop. Each caller awaits its own future; after `timeout` seconds it
+    gives up on the batch and predicts directly.
+    """
+
+    def __init__(self, max_batch: int = 32, max_delay: float = 0.005, timeout: float = 5.0):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list = []  # requests taken off the queue and not yet answered
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_run_done)
+
+    def _on_run_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():  # loop shutting down
+            return
+        exc = task.exception()
+        logger.error("[PredictBatcher] batch loop died, restarting: %r", exc, exc_info=exc)
+        batch, self._batch = self._batch, []
+        self.start()
+        self._fail(batch, RuntimeError("prediction batch loop failed"))
+
+    @staticmethod
+    def _fail(batch: list, exc: BaseException) -> None:
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def predict(self, expert_valuations, tabular_features, current_price):
+        if self._queue is None:  # startup hook not run (e.g. app mounted without lifespan)
+            return await asyncio.to_thread(
+                predictor.predict, expert_valuations, tabular_features, current_price
+            )
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put(((expert_valuations, tabular_features, current_price), fut))
+        try:
+            return await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("[PredictBatcher] no batch result after %.1fs, predicting directly", self.timeout)
+            return await asyncio.to_thread(
+                predictor.predict, expert_valuations, tabular_features, current_price
+            )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Skip requests whose caller already gave up (timed out and predicted
+            # directly, or disconnected) so their work is not done twice
+            self._batch = batch = [(req, fut) for req, fut in batch if not fut.done()]
+            if not batch:
+                continue
+
+            try:
+                results = await asyncio.to_thread(
+                    predictor.predict_batch, [req for req, _ in batch]
+                )
+            except Exception:
+                # Isolate the failing request: retry each one on its own
+                for req, fut in batch:
+                    if fut.done():
+                        continue
+                    try:
+                        result = await asyncio.to_thread(predictor.predict, *req)
+                    except Exception as e:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    else:
+                        if not fut.done():
+                            fut.set_result(result)
+                self._batch = []
+                continue
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():  # caller may have disconnected
+                    fut.set_result(result)
+            if len(results) != len(batch):
+                self._fail(batch[len(results):], RuntimeError(
+                    f"predict_batch returned {len(results)} results for {len(batch)} requests"
+                ))
+            self._batch = []
+
+
+_predict_batcher = _PredictBatcher()
+
+
+@app.on_event("startup")
+async def _start_predict_batcher():
+    _predict_batcher.start()
+
+
+def _warm_models() -> None:
+    """One throwaway call per in-process model so the first real request does not
+    pay lazy initialisation (torch kernels, scipy FFT plans, first-call imports)."""
+    from spectral_cycle_analyzer import SpectralCycleAnalyzer
+
+    predictor.predict([100.0] * 7, [0.1] * 6, 100.0)
+    quality_predictor.predict(features=[0.1] * 45)
+    closes = 100.0 + np.cumsum(np.random.default_rng(0).normal(0.0, 1.0, 400))
+    SpectralCycleAnalyzer().compute_rolling_reconstruction(
+        historical_data=[{'date': str(i), 'close': float(c)} for i, c in enumerate(closes)],
+        window=256, num_freq=8, output_bars=60, threshold_pct=0.002,
+    )
+
+
+@app.on_event("startup")
+async def _warm_up_models():
+    """Warm the models before serving; set WARMUP_ON_STARTUP=0 to skip."""
+    if os.environ.get("WARMUP_ON_STARTUP", "1") != "1":
+        return
+    t0 = time.perf_counter()
+    try:
+        await asyncio.to_thread(_warm_models)
+    except Exception as e:
+        logger.warning("[Warmup] skipped: %s", e)
+        return
+    logger.info("[Warmup] models ready in %.0f ms", (time.perf_counter() - t0) * 1000)
+
+
 @app.post("/advancevalue/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest):
     """
@@ -387,18 +628,21 @@ async def predict(request: PredictionRequest):
         if request.current_price <= 0:
             raise HTTPException(status_code=400, detail="current_price must be positive")
 
+        # Reject before queueing for the model when too few experts are usable
+        if len(valid_expert_values(request.expert_valuations, request.current_price)) < MIN_VALID_EXPERTS:
+            raise HTTPException(
+                status_code=400,
+                detail="Not enough valid expert valuations (need at least 3)"
+            )
+
         # Clean expert valuations (replace None with 0 for filtering)
-        expert_vals = [v if v is not None else 0 for v in request.expert_valuations]
+        expert_vals = _float_array(request.expert_valuations)
 
         # Clean tabular features
-        tabular = [v if v is not None else 0 for v in request.tabular_features]
+        tabular = _float_array(request.tabular_features)
 
         # Get prediction
-        result = predictor.predict(
-            expert_valuations=expert_vals,
-            tabular_features=tabular,
-            current_price=request.current_price
-        )
+        result = await _predict_batcher.predict(expert_vals, tabular, request.current_price)
 
         if result is None:
             raise HTTPException(
@@ -466,43 +710,23 @@ async def resumen_predict(req: ResumenRequest):
     Returns full chain-of-thought reasoning with actionable investment advice.
     """
     try:
-        print(f"[NeuralEngine] Starting 14-layer analysis for {req.ticker}")
+        logger.info("[NeuralEngine] Starting 14-layer analysis for %s", req.ticker)
 
         # Convert request to dictionary for the engine
-        data = {
-            'ticker': req.ticker,
-            'currentPrice': req.currentPrice,
-            'advanceValueNet': req.advanceValueNet,
-            'companyQualityNet': req.companyQualityNet,
-            'keyMetricsSummary': req.keyMetricsSummary,
-            'sustainableGrowthRate': req.sustainableGrowthRate,
-            'wacc': req.wacc,
-            'dcfValuation': req.dcfValuation,
-            'monteCarlo': req.monteCarlo,
-            'pivotAnalysis': req.pivotAnalysis,
-            'holdersData': req.holdersData,
-            'forecasts': req.forecasts,
-            'diarioStats': req.diarioStats,
-            'news': req.news,
-            'averageValuation': req.averageValuation,
-            'fmp_api_key': os.environ.get('FMP_API_KEY'),
-            'profile': req.profile,
-            'ratiosTTM': req.ratiosTTM,
-        }
+        data = req.model_dump()
+        data['fmp_api_key'] = FMP_API_KEY
 
         # Run the 14-layer neural reasoning engine
-        result = neural_engine.analyze(data)
+        result = await asyncio.to_thread(neural_engine.analyze, data)
 
-        print(f"[NeuralEngine] Analysis complete: {result['finalRecommendation']} ({result['conviction']}%)")
-        print(f"[NeuralEngine] Processed {len(result.get('chainOfThought', []))} neural layers")
-        print(f"[NeuralEngine] Signals: {result.get('signalSummary', {})}")
+        logger.info("[NeuralEngine] Analysis complete: %s (%s%%)", result['finalRecommendation'], result['conviction'])
+        logger.info("[NeuralEngine] Processed %s neural layers", len(result.get('chainOfThought', [])))
+        logger.info("[NeuralEngine] Signals: %s", result.get('signalSummary', {}))
 
         return result
 
     except Exception as e:
-        print(f"[NeuralEngine] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[NeuralEngine] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -532,7 +756,8 @@ async def earnings_prediction(req: EarningsPredictionRequest):
     and volatility into BEAT/MISS scenario probabilities.
     """
     try:
-        result = predict_earnings_outcome(
+        result = await asyncio.to_thread(
+            predict_earnings_outcome,
             ticker=req.ticker,
             profile=req.profile,
             quality=req.quality,
@@ -547,8 +772,7 @@ async def earnings_prediction(req: EarningsPredictionRequest):
         )
         return numpy_safe_response(result)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/earnings-prediction] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -568,6 +792,31 @@ class ProbabilityRequest(BaseModel):
     useImpliedVol: bool = True         # Try Yahoo Finance for IV
 
 
+# Binomial-tree results keyed on the request with prices bucketed to the cent, so
+# UI polling for the same ticker/target reuses one tree (and one IV lookup).
+_PROBABILITY_RESULTS = _CoalescingCache(ttl=300.0, maxsize=4096)
+
+
+async def _compute_probability(req: ProbabilityRequest) -> Dict[str, Any]:
+    result = await asyncio.to_thread(
+        probability_engine.calculate,
+        ticker=req.ticker,
+        current_price=req.currentPrice,
+        target_price=req.targetPrice,
+        risk_free_rate=req.riskFreeRate,
+        dividend_yield=req.dividendYield,
+        days=req.days,
+        steps=req.steps,
+        use_implied_vol=req.useImpliedVol,
+        fmp_api_key=FMP_API_KEY,
+    )
+
+    if result.get('error'):
+        raise HTTPException(status_code=500, detail=result['error'])
+
+    return result
+
+
 @app.post("/probability/calculate")
 async def probability_calculate(req: ProbabilityRequest):
     """
@@ -575,35 +824,21 @@ async def probability_calculate(req: ProbabilityRequest):
     using the CRR Binomial Tree model.
 
     Uses historical volatility from FMP and optionally implied volatility
-    from Yahoo Finance options chain.
+    from Yahoo Finance options chain. Results are cached for 5 minutes per
+    input set (prices rounded to the cent).
     """
     try:
-        print(f"[Probability] Calculating for {req.ticker}: "
-              f"target=${req.targetPrice}, days={req.days}")
+        logger.info("[Probability] Calculating for %s: target=$%s, days=%s",
+                    req.ticker, req.targetPrice, req.days)
 
-        result = probability_engine.calculate(
-            ticker=req.ticker,
-            current_price=req.currentPrice,
-            target_price=req.targetPrice,
-            risk_free_rate=req.riskFreeRate,
-            dividend_yield=req.dividendYield,
-            days=req.days,
-            steps=req.steps,
-            use_implied_vol=req.useImpliedVol,
-            fmp_api_key=os.environ.get('FMP_API_KEY'),
-        )
-
-        if result.get('error'):
-            raise HTTPException(status_code=500, detail=result['error'])
-
-        return result
+        key = (req.ticker, round(req.currentPrice, 2), round(req.targetPrice, 2),
+               req.riskFreeRate, req.dividendYield, req.days, req.steps, req.useImpliedVol)
+        return await _PROBABILITY_RESULTS.get(key, lambda: _compute_probability(req))
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Probability] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Probability] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -642,10 +877,10 @@ async def analyze_market_sentiment(req: MarketSentimentRequest):
     - Market briefing narrative
     """
     try:
-        print(f"[MarketSentiment] Analyzing market sentiment...")
-        print(f"[MarketSentiment] News items: {len(req.news or [])}")
-        print(f"[MarketSentiment] Gainers: {len(req.gainers or [])}")
-        print(f"[MarketSentiment] Losers: {len(req.losers or [])}")
+        logger.info("[MarketSentiment] Analyzing market sentiment...")
+        logger.info("[MarketSentiment] News items: %s", len(req.news or []))
+        logger.info("[MarketSentiment] Gainers: %s", len(req.gainers or []))
+        logger.info("[MarketSentiment] Losers: %s", len(req.losers or []))
 
         data = {
             'news': req.news or [],
@@ -660,16 +895,16 @@ async def analyze_market_sentiment(req: MarketSentimentRequest):
             'indexBreadth': req.indexBreadth,
         }
 
-        result = market_sentiment_engine.analyze(data, language=req.language or 'en')
+        result = await asyncio.to_thread(
+            market_sentiment_engine.analyze, data, language=req.language or 'en'
+        )
 
-        print(f"[MarketSentiment] Result: {result['overallSentiment']} (score: {result['compositeScore']})")
+        logger.info("[MarketSentiment] Result: %s (score: %s)", result['overallSentiment'], result['compositeScore'])
 
         return result
 
     except Exception as e:
-        print(f"[MarketSentiment] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[MarketSentiment] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -702,15 +937,15 @@ async def momentum_analyze(req: MomentumRequest):
     try:
         from momentum_engine import get_momentum_analyzer
         analyzer = get_momentum_analyzer()
-        result = analyzer.analyze(
+        result = await asyncio.to_thread(
+            analyzer.analyze,
             ticker=req.ticker,
             benchmark=req.benchmark,
             timeframes=req.timeframes,
         )
         return result
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/momentum/analyze] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -729,8 +964,9 @@ class GapAnalysisRequest(BaseModel):
 async def gaps_analyze(req: GapAnalysisRequest):
     """Analyze historical price gaps and compute behavioral statistics."""
     try:
-        api_key = os.environ.get('FMP_API_KEY', '')
-        result = analyze_gaps(
+        api_key = FMP_API_KEY or ''
+        result = await asyncio.to_thread(
+            analyze_gaps,
             ticker=req.ticker,
             days=req.days,
             gap_threshold_pct=req.gapThresholdPct,
@@ -739,8 +975,7 @@ async def gaps_analyze(req: GapAnalysisRequest):
         )
         return result
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/gaps/analyze] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -758,20 +993,78 @@ async def dilution_analyze(req: DilutionRequest):
     historial de O/S, cash runway y scores de riesgo (SEC EDGAR + FMP)."""
     try:
         from dilution_engine import get_dilution_engine
-        api_key = os.environ.get('FMP_API_KEY', '')
+        api_key = FMP_API_KEY or ''
         engine = get_dilution_engine(api_key)
-        result = engine.analyze(req.ticker)
+        result = await asyncio.to_thread(engine.analyze, req.ticker)
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
         return result
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/dilution/analyze] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# /fft-signal results keyed by (ticker, window, numFreq, outputBars, thresholdPct,
+# day): the inputs are daily bars, so repeat calls within the TTL are a dict hit.
+_FFT_RESULTS = _CoalescingCache(ttl=900.0, maxsize=2048)
+
+
+_FFT_FETCHER = None
+
+
+def _fft_fetcher(api_key: str):
+    """Long-lived fetcher for /fft-signal: keeps its bar cache and the pooled
+    FMP connection across requests instead of rebuilding both per call."""
+    global _FFT_FETCHER
+    from spectral_cycle_analyzer import HistoricalDataFetcher
+
+    if _FFT_FETCHER is None or _FFT_FETCHER.api_key != api_key:
+        _FFT_FETCHER = HistoricalDataFetcher(api_key)
+    return _FFT_FETCHER
+
+
+async def _compute_fft_signal(req: FFTSignalRequest) -> Dict[str, Any]:
+    from spectral_cycle_analyzer import SpectralCycleAnalyzer
+
+    fmp_api_key = FMP_API_KEY
+    if not fmp_api_key:
+        raise HTTPException(status_code=400, detail="FMP_API_KEY not configured on server")
+
+    fetcher = _fft_fetcher(fmp_api_key)
+    historical = await asyncio.to_thread(
+        fetcher.fetch, req.ticker, max_bars=req.window + req.outputBars + 50
+    )
+
+    if not historical or len(historical) < req.window + 5:
+        bars = len(historical) if historical else 0
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient data for {req.ticker}: got {bars} bars, need {req.window + 5}"
+        )
+
+    analyzer = SpectralCycleAnalyzer()
+    result = await asyncio.to_thread(
+        analyzer.compute_rolling_reconstruction,
+        historical_data=historical,
+        window=req.window,
+        num_freq=req.numFreq,
+        output_bars=req.outputBars,
+        threshold_pct=req.thresholdPct,
+    )
+
+    if result.get('error'):
+        raise HTTPException(status_code=500, detail=result['error'])
+
+    return {
+        "ticker":        req.ticker,
+        "window":        req.window,
+        "numFreq":       req.numFreq,
+        **result
+    }
+
+
 @app.post("/fft-signal")
 async def fft_signal(req: FFTSignalRequest):
     """
@@ -786,48 +1079,21 @@ async def fft_signal(req: FFTSignalRequest):
       6. Signal: price > fft_curve*(1+threshold) → long, else flat
 
     Returns rollingCurve + complexComponents for the most recent window.
+    Results are cached server-side for 15 minutes per parameter set and day.
     """
     try:
-        from spectral_cycle_analyzer import SpectralCycleAnalyzer, HistoricalDataFetcher
-
-        fmp_api_key = os.environ.get('FMP_API_KEY')
-        if not fmp_api_key:
-            raise HTTPException(status_code=400, detail="FMP_API_KEY not configured on server")
+        key = (req.ticker, req.window, req.numFreq, req.outputBars, req.thresholdPct,
+               date.today().isoformat())
+        result = await _FFT_RESULTS.get(key, lambda: _compute_fft_signal(req))
 
-        fetcher = HistoricalDataFetcher(fmp_api_key)
-        historical = fetcher.fetch(req.ticker, max_bars=req.window + req.outputBars + 50)
-
-        if not historical or len(historical) < req.window + 5:
-            bars = len(historical) if historical else 0
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient data for {req.ticker}: got {bars} bars, need {req.window + 5}"
-            )
-
-        analyzer = SpectralCycleAnalyzer()
-        result = analyzer.compute_rolling_reconstruction(
-            historical_data=historical,
-            window=req.window,
-            num_freq=req.numFreq,
-            output_bars=req.outputBars,
-            threshold_pct=req.thresholdPct,
-        )
-
-        if result.get('error'):
-            raise HTTPException(status_code=500, detail=result['error'])
-
-        return {
-            "ticker":        req.ticker,
-            "window":        req.window,
-            "numFreq":       req.numFreq,
-            **result
-        }
+        response = numpy_safe_response(result)
+        response.headers["Cache-Control"] = "public, max-age=900, stale-while-revalidate=300"
+        return response
 
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/fft-signal] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -903,10 +1169,10 @@ async def portfolio_optimize(req: PortfolioOptimizeRequest):
     risk metrics (VaR, CVaR, Sortino, Calmar), correlation matrix, and backtest.
     """
     try:
-        print(f"[PortfolioOpt] Optimizing {req.tickers} — objective={req.objective}")
+        logger.info("[PortfolioOpt] Optimizing %s — objective=%s", req.tickers, req.objective)
 
         engine = PortfolioOptimizer(
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
             risk_free_rate=req.riskFreeRate,
         )
 
@@ -940,17 +1206,16 @@ async def portfolio_optimize(req: PortfolioOptimizeRequest):
         for stat in result.get('individualStats', []):
             stat['weight'] = opt_w.get(stat['ticker'], 0.0)
 
-        print(f"[PortfolioOpt] Done — Sharpe={result['portfolioSharpe']}, "
-              f"Return={result['portfolioReturn']:.2%}, Vol={result['portfolioVolatility']:.2%}")
+        logger.info("[PortfolioOpt] Done — Sharpe=%s, Return=%.2f%%, Vol=%.2f%%",
+                    result['portfolioSharpe'], result['portfolioReturn'] * 100,
+                    result['portfolioVolatility'] * 100)
 
         return result
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[PortfolioOpt] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[PortfolioOpt] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -961,10 +1226,8 @@ async def portfolio_factor_regression(req: FactorRegressionRequest):
     Returns alpha, beta, R², residual vol, information ratio, and risk decomposition.
     """
     try:
-        import traceback
-
         engine = PortfolioOptimizer(
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
             risk_free_rate=req.risk_free_rate,
         )
 
@@ -1049,8 +1312,7 @@ async def portfolio_factor_regression(req: FactorRegressionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/portfolio/factor-regression] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1061,7 +1323,7 @@ async def portfolio_pca(req: PCARequest):
     with variance explained, eigenvalues, and loadings per ticker.
     """
     try:
-        engine = PortfolioOptimizer(api_key=os.environ.get('FMP_API_KEY'))
+        engine = PortfolioOptimizer(api_key=FMP_API_KEY)
         prices = engine._fetch_prices(req.tickers, req.period_days)
         valid_tickers = [t for t in req.tickers if t in prices]
         if len(valid_tickers) < 2:
@@ -1113,8 +1375,7 @@ async def portfolio_pca(req: PCARequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/portfolio/pca] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1127,7 +1388,7 @@ async def portfolio_match_exposures(req: MatchExposuresRequest):
         from scipy.optimize import minimize as sp_minimize
 
         engine = PortfolioOptimizer(
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
             risk_free_rate=req.risk_free_rate,
         )
 
@@ -1210,8 +1471,7 @@ async def portfolio_match_exposures(req: MatchExposuresRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/portfolio/match-exposures] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1225,10 +1485,10 @@ async def portfolio_black_litterman(req: BlackLittermanRequest):
         import requests as req_lib
 
         engine = PortfolioOptimizer(
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
             risk_free_rate=req.risk_free_rate,
         )
-        api_key = os.environ.get('FMP_API_KEY')
+        api_key = FMP_API_KEY
 
         prices = engine._fetch_prices(req.tickers, req.period_days)
         valid_tickers = [t for t in req.tickers if t in prices]
@@ -1347,8 +1607,7 @@ async def portfolio_black_litterman(req: BlackLittermanRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/portfolio/black-litterman] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1362,7 +1621,7 @@ async def portfolio_rolling(req: RollingOptimizationRequest):
         from datetime import datetime, timedelta
 
         engine = PortfolioOptimizer(
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
             risk_free_rate=req.risk_free_rate,
         )
 
@@ -1435,8 +1694,7 @@ async def portfolio_rolling(req: RollingOptimizationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        _log_exception("[/portfolio/rolling] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1472,29 +1730,27 @@ async def ml_predict(req: MLPredictRequest):
         )
 
     try:
-        print(f"[MLPredict] Predicting for {req.ticker}, horizons={req.horizons or [5,10,20,30]}")
+        logger.info("[MLPredict] Predicting for %s, horizons=%s", req.ticker, req.horizons or [5,10,20,30])
 
         result = predict_price(
             ticker=req.ticker,
             horizons=req.horizons,
-            api_key=os.environ.get('FMP_API_KEY'),
+            api_key=FMP_API_KEY,
         )
 
         if result.get('error'):
-            print(f"[MLPredict] Error: {result['error']}")
+            logger.error("[MLPredict] Error: %s", result['error'])
             raise HTTPException(status_code=500, detail=result['error'])
 
-        print(f"[MLPredict] Done for {req.ticker} in {result.get('elapsedSeconds', '?')}s "
-              f"— {len(result.get('predictions', []))} horizons predicted")
+        logger.info("[MLPredict] Done for %s in %ss — %s horizons predicted",
+                    req.ticker, result.get('elapsedSeconds', '?'), len(result.get('predictions', [])))
 
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[MLPredict] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[MLPredict] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1572,22 +1828,20 @@ async def options_chain(req: OptionsChainRequest):
     strike, last price, bid, ask, volume, open interest, and implied volatility.
     """
     try:
-        print(f"[Options] Fetching chain for {req.ticker}")
+        logger.info("[Options] Fetching chain for %s", req.ticker)
         result = fetch_options_chain(req.ticker)
 
         if result.get('error'):
             raise HTTPException(status_code=500, detail=result['error'])
 
         exp_count = len(result.get('expirations', []))
-        print(f"[Options] Chain fetched: {exp_count} expirations for {req.ticker}")
+        logger.info("[Options] Chain fetched: %s expirations for %s", exp_count, req.ticker)
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Options] Error fetching chain: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Options] Error fetching chain: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1604,7 +1858,7 @@ async def options_analyze(req: OptionsAnalyzeRequest):
     """
     try:
         if req.strategyName and req.expiration:
-            print(f"[Options] Auto-analyze '{req.strategyName}' for {req.ticker} exp={req.expiration}")
+            logger.info("[Options] Auto-analyze '%s' for %s exp=%s", req.strategyName, req.ticker, req.expiration)
             result = auto_analyze_options_strategy(
                 ticker=req.ticker,
                 strategy_name=req.strategyName,
@@ -1614,7 +1868,7 @@ async def options_analyze(req: OptionsAnalyzeRequest):
                 dividend_yield=req.dividendYield,
             )
         elif req.legs:
-            print(f"[Options] Manual analyze for {req.ticker}: {len(req.legs)} legs")
+            logger.info("[Options] Manual analyze for %s: %s legs", req.ticker, len(req.legs))
             result = analyze_options_strategy(
                 ticker=req.ticker,
                 legs=req.legs,
@@ -1631,16 +1885,14 @@ async def options_analyze(req: OptionsAnalyzeRequest):
         if result.get('error'):
             raise HTTPException(status_code=500, detail=result['error'])
 
-        print(f"[Options] Analysis done — maxProfit={result.get('maxProfit')}, "
-              f"maxLoss={result.get('maxLoss')}, PoP={result.get('probabilityOfProfit')}")
+        logger.info("[Options] Analysis done — maxProfit=%s, maxLoss=%s, PoP=%s",
+                    result.get('maxProfit'), result.get('maxLoss'), result.get('probabilityOfProfit'))
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Options] Error analyzing strategy: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Options] Error analyzing strategy: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1654,7 +1906,7 @@ async def options_suggest(req: OptionsSuggestRequest):
     ideal IV environment, and rationale.
     """
     try:
-        print(f"[Options] Suggesting strategies for {req.ticker}, outlook={req.outlook}")
+        logger.info("[Options] Suggesting strategies for %s, outlook=%s", req.ticker, req.outlook)
 
         result = suggest_options_strategies(
             ticker=req.ticker,
@@ -1663,13 +1915,11 @@ async def options_suggest(req: OptionsSuggestRequest):
             budget=req.budget,
         )
 
-        print(f"[Options] {len(result)} strategies suggested for {req.outlook} outlook")
+        logger.info("[Options] %s strategies suggested for %s outlook", len(result), req.outlook)
         return {"ticker": req.ticker, "outlook": req.outlook, "strategies": result}
 
     except Exception as e:
-        print(f"[Options] Error suggesting strategies: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Options] Error suggesting strategies: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1684,7 +1934,7 @@ async def options_scan(req: OptionsScanRequest):
     Each combination includes pre-built legs ready to pass to /options/analyze.
     """
     try:
-        print(f"[Options] Scanning '{req.strategyName}' for {req.ticker} exp={req.expiration}")
+        logger.info("[Options] Scanning '%s' for %s exp=%s", req.strategyName, req.ticker, req.expiration)
         result = scan_options_combinations(
             ticker=req.ticker,
             strategy_name=req.strategyName,
@@ -1694,14 +1944,13 @@ async def options_scan(req: OptionsScanRequest):
         )
         if result.get('error'):
             raise HTTPException(status_code=500, detail=result['error'])
-        print(f"[Options] Scan done: {result.get('total', 0)} combos evaluated, "
-              f"returning {len(result.get('combinations', []))}")
+        logger.info("[Options] Scan done: %s combos evaluated, returning %s",
+                    result.get('total', 0), len(result.get('combinations', [])))
         return result
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Options] Scan error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Options] Scan error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1715,7 +1964,7 @@ async def options_iv_surface(req: OptionsIVSurfaceRequest):
     Includes both call IV and put IV matrices.
     """
     try:
-        print(f"[Options] Building IV surface for {req.ticker}")
+        logger.info("[Options] Building IV surface for %s", req.ticker)
         result = get_iv_surface(req.ticker)
 
         if result.get('error'):
@@ -1723,15 +1972,13 @@ async def options_iv_surface(req: OptionsIVSurfaceRequest):
 
         strikes_count = len(result.get('strikes', []))
         exp_count = len(result.get('expirations', []))
-        print(f"[Options] IV surface built: {strikes_count} strikes x {exp_count} expirations")
+        logger.info("[Options] IV surface built: %s strikes x %s expirations", strikes_count, exp_count)
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Options] Error building IV surface: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Options] Error building IV surface: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1744,22 +1991,21 @@ async def options_sentiment(req: OptionsSentimentRequest):
     bias score, and AI-generated insights.
     """
     try:
-        print(f"[Options] Computing sentiment for {req.ticker}")
+        logger.info("[Options] Computing sentiment for %s", req.ticker)
         result = get_options_sentiment(req.ticker, lang=req.lang)
 
         if result.get('error'):
             raise HTTPException(status_code=500, detail=result['error'])
 
-        print(f"[Options] Sentiment done for {req.ticker}: bias={result.get('biasScore', {}).get('label', 'N/A')}, "
-              f"{len(result.get('anomalies', []))} anomalies, {len(result.get('insights', []))} insights")
+        logger.info("[Options] Sentiment done for %s: bias=%s, %s anomalies, %s insights",
+                    req.ticker, result.get('biasScore', {}).get('label', 'N/A'),
+                    len(result.get('anomalies', [])), len(result.get('insights', [])))
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Options] Error computing sentiment: {e}")
-        import traceback
-        traceback.print_exc()
+        _log_exception("[Options] Error computing sentiment: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1917,8 +2163,7 @@ async def options_evaluate(req: OptionsEvaluateRequest):
         }
 
     except Exception as e:
-        print(f"[Options] Error evaluating strategy: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Options] Error evaluating strategy: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1943,8 +2188,7 @@ async def supply_chain_analyze(req: SupplyChainRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Supply Chain] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Supply Chain] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1988,8 +2232,7 @@ async def quantum_portfolio_optimize(req: QuantumPortfolioRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Quantum Portfolio] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Quantum Portfolio] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2011,8 +2254,7 @@ async def drl_simulate(req: DRLSimulateRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[DRL Trading] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[DRL Trading] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2033,8 +2275,7 @@ async def quantum_risk_model(req: QuantumRiskRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Quantum Risk] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Quantum Risk] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2090,8 +2331,7 @@ async def htf_detect(req: HTFDetectionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[HTF Detection] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[HTF Detection] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2139,7 +2379,7 @@ async def htf_scan(req: HTFScanRequest):
     try:
         engine._ensure_ml_model()
     except Exception as e:
-        print(f"[HTF Scan] ML pre-train failed (heuristic fallback): {e}")
+        logger.warning("[HTF Scan] ML pre-train failed (heuristic fallback): %s", e)
 
     def scan_one(t: HTFScanTicker) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """→ (result | None, error_reason | None). (None, None) = analyzed, no pattern."""
@@ -2215,7 +2455,7 @@ async def htf_scan(req: HTFScanRequest):
                 'patternsCount': len(data.get('patterns') or []),
             }, None
         except Exception as e:
-            print(f"[HTF Scan] {t.symbol} failed: {e}")
+            logger.warning("[HTF Scan] %s failed: %s", t.symbol, e)
             return None, str(e)
 
     loop = asyncio.get_running_loop()
@@ -2273,8 +2513,7 @@ async def ep_detect(req: EPDetectionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[EP Detection] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[EP Detection] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2311,8 +2550,7 @@ async def gap_cycle_scan(req: GapCycleRequest):
         )
         return numpy_safe_response(result)
     except Exception as e:
-        print(f"[Gap Cycle] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Gap Cycle] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2342,8 +2580,7 @@ async def ma_bounce_detect(req: MABounceRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[MA Bounce] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[MA Bounce] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2375,8 +2612,7 @@ async def former_runner_detect(req: FormerRunnerRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Former Runner] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Former Runner] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2414,8 +2650,7 @@ async def cheap_breakout_detect(req: CheapBreakoutRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Cheap Breakout] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Cheap Breakout] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2445,8 +2680,7 @@ async def consecutive_days_detect(req: ConsecutiveDaysRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Consecutive Days] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Consecutive Days] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2476,8 +2710,7 @@ async def compression_detect(req: CompressionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Compression] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Compression] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2592,14 +2825,14 @@ async def _start_scanner_cache():
             if engine.status().get('stale', True):
                 await asyncio.to_thread(engine.refresh)
         except Exception as e:
-            print(f"[ScannerCache] initial refresh error: {e}")
+            logger.error("[ScannerCache] initial refresh error: %s", e)
         # Then rebuild every 24h.
         while True:
             await asyncio.sleep(24 * 3600)
             try:
                 await asyncio.to_thread(engine.refresh)
             except Exception as e:
-                print(f"[ScannerCache] scheduled refresh error: {e}")
+                logger.error("[ScannerCache] scheduled refresh error: %s", e)
 
     asyncio.create_task(loop())
 
@@ -2649,8 +2882,7 @@ async def run_backtest(req: BacktestRequest):
             )
             return numpy_safe_response(result)
     except Exception as e:
-        print(f"[Backtest] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Backtest] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2692,8 +2924,7 @@ async def gap_short_backtest_start(req: GapShortBacktestRequest):
         job_id = gap_short_start_job(req.dict())
         return {"job_id": job_id}
     except Exception as e:
-        print(f"[GapShortBT] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[GapShortBT] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2725,7 +2956,7 @@ async def gap_short_backtest_chart(req: GapShortChartRequest):
         bars = await asyncio.to_thread(engine.trade_chart, req.symbol, req.date, req.interval)
         return numpy_safe_response({"bars": bars})
     except Exception as e:
-        print(f"[GapShortBT] chart error: {e}")
+        logger.error("[GapShortBT] chart error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2774,8 +3005,7 @@ async def strategy_one_backtest_start(req: StrategyOneBacktestRequest):
         job_id = strategy_one_start_job(req.dict())
         return {"job_id": job_id}
     except Exception as e:
-        print(f"[StrategyOneBT] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[StrategyOneBT] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2816,8 +3046,7 @@ async def edge_finder_start(req: EdgeFinderRequest):
         job_id = edge_finder_start_job(req.dict())
         return {"job_id": job_id}
     except Exception as e:
-        print(f"[EdgeFinder] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[EdgeFinder] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2848,7 +3077,7 @@ async def edge_finder_chart(req: EdgeFinderChartRequest):
         bars = await asyncio.to_thread(engine.event_chart, req.symbol, req.date)
         return numpy_safe_response({"bars": bars})
     except Exception as e:
-        print(f"[EdgeFinder] chart error: {e}")
+        logger.error("[EdgeFinder] chart error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2879,8 +3108,7 @@ async def edge_predictor_start(req: EdgePredictorRequest):
         job_id = edge_predictor_start_job(req.dict())
         return {"job_id": job_id}
     except Exception as e:
-        print(f"[EdgePredictor] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[EdgePredictor] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2911,7 +3139,7 @@ async def edge_predictor_chart(req: EdgePredictorChartRequest):
         bars = await asyncio.to_thread(engine.candidate_chart, req.symbol, req.bars)
         return numpy_safe_response({"bars": bars})
     except Exception as e:
-        print(f"[EdgePredictor] chart error: {e}")
+        logger.error("[EdgePredictor] chart error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2939,8 +3167,7 @@ async def ultimate_predictor_start(req: UltimatePredictorRequest):
         job_id = ultimate_start_job(req.dict())
         return {"job_id": job_id}
     except Exception as e:
-        print(f"[Ultimate] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[Ultimate] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2966,7 +3193,7 @@ async def ultimate_predictor_grade():
         data = await asyncio.to_thread(ultimate_grade_now)
         return numpy_safe_response(data)
     except Exception as e:
-        print(f"[Ultimate] grade error: {e}")
+        logger.error("[Ultimate] grade error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2979,7 +3206,7 @@ async def ultimate_predictor_history():
         data = await asyncio.to_thread(ultimate_get_history)
         return numpy_safe_response(data)
     except Exception as e:
-        print(f"[Ultimate] history error: {e}")
+        logger.error("[Ultimate] history error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2998,7 +3225,7 @@ async def ultimate_prediction_detail(pred_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[Ultimate] prediction detail error: {e}")
+        logger.error("[Ultimate] prediction detail error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3020,8 +3247,7 @@ async def weekly_report_start(req: WeeklyReportRequest):
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        print(f"[WeeklyReport] start error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[WeeklyReport] start error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3102,8 +3328,7 @@ async def monte_carlo_advanced_predict(req: AdvancedMonteCarloRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[AdvancedMonteCarlo] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[AdvancedMonteCarlo] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3133,7 +3358,7 @@ async def cycle_models_analyze(req: CycleModelsRequest):
     if not CYCLE_MODELS_AVAILABLE or get_cycle_models_engine is None:
         raise HTTPException(status_code=503, detail="Cycle Models engine no disponible")
 
-    fmp_api_key = os.environ.get("FMP_API_KEY")
+    fmp_api_key = FMP_API_KEY
     if not fmp_api_key:
         raise HTTPException(status_code=400, detail="FMP_API_KEY no configurada en el servidor")
 
@@ -3154,8 +3379,7 @@ async def cycle_models_analyze(req: CycleModelsRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[CycleModels] Error: {e}")
-        import traceback; traceback.print_exc()
+        _log_exception("[CycleModels] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
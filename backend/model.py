@@ -2,8 +2,11 @@
 # AdvanceValue Net - Neural Ensemble for Stock Valuation
 # Simplified version that works without pre-training
 
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 try:
     import torch
     import torch.nn as nn
@@ -11,7 +14,7 @@ try:
     TORCH_AVAILABLE = True
 except ImportError:
     TORCH_AVAILABLE = False
-    print("[WARNING] PyTorch not available - AdvanceValueNet will use fallback predictor")
+    logger.warning("PyTorch not available - AdvanceValueNet will use fallback predictor")
 
 
 if TORCH_AVAILABLE:
@@ -108,6 +111,15 @@ if TORCH_AVAILABLE:
             }
 
 
+MIN_VALID_EXPERTS = 3
+
+
+def valid_expert_values(expert_valuations, current_price: float) -> list[float]:
+    """Expert valuations the ensemble will use: positive, finite, below 10x price."""
+    values = np.asarray(expert_valuations, dtype=np.float64)  # None -> nan
+    return values[np.isfinite(values) & (values > 0) & (values < current_price * 10)].tolist()
+
+
 class AdvanceValuePredictor:
     """
     Wrapper that combines the neural network with heuristic ensemble
@@ -123,8 +135,8 @@ class AdvanceValuePredictor:
 
     def predict(
         self,
-        expert_valuations: list[float],
-        tabular_features: list[float],
+        expert_valuations: list[float] | np.ndarray,
+        tabular_features: list[float] | np.ndarray,
         current_price: float
     ) -> dict:
         """
@@ -138,13 +150,37 @@ class AdvanceValuePredictor:
         Returns:
             dict with fair_value, confidence_interval, signal
         """
-        # Filter valid expert valuations (positive, finite, reasonable)
-        valid_experts = [
-            v for v in expert_valuations
-            if v is not None and v > 0 and np.isfinite(v) and v < current_price * 10
+        return self.predict_batch([(expert_valuations, tabular_features, current_price)])[0]
+
+    def predict_batch(self, requests: list[tuple]) -> list:
+        """
+        Predict for several (expert_valuations, tabular_features, current_price)
+        requests with a single network forward pass.
+
+        The heuristic ensemble is per request; the neural adjustment of every
+        request with enough valid experts is computed as one stacked batch (the
+        model is in eval mode, so rows don't interact). Returns one result per
+        request, None where there were fewer than 3 valid expert valuations.
+        """
+        prepared = [self._prepare(*req) for req in requests]
+        ready = [p for p in prepared if p is not None]
+        adjustments = iter(self._neural_adjustments(ready))
+        return [
+            None if p is None else self._finalize(p, next(adjustments))
+            for p in prepared
         ]
 
-        if len(valid_experts) < 3:
+    def _prepare(
+        self,
+        expert_valuations: list[float] | np.ndarray,
+        tabular_features: list[float] | np.ndarray,
+        current_price: float
+    ):
+        """Valid experts and their weighted base ensemble, or None if < 3 valid."""
+        # Filter valid expert valuations (positive, finite, reasonable)
+        valid_experts = valid_expert_values(expert_valuations, current_price)
+
+        if len(valid_experts) < MIN_VALID_EXPERTS:
             return None
 
         # Calculate base ensemble (weighted average of experts)
@@ -161,21 +197,30 @@ class AdvanceValuePredictor:
         weights = weights / weights.sum()
         base_value = np.sum(np.array(valid_experts) * weights)
 
-        # Neural network adjustment (only if torch available)
-        adjustment = 0.0
-        if TORCH_AVAILABLE and self.model is not None:
-            expert_tensor = torch.zeros(1, 20)
-            for i, v in enumerate(valid_experts[:20]):
-                expert_tensor[0, i] = v / current_price  # Normalize by price
-
-            tabular_tensor = torch.zeros(1, 30)
-            for i, v in enumerate(tabular_features[:30]):
-                if v is not None and np.isfinite(v):
-                    tabular_tensor[0, i] = float(v)
-
-            with torch.no_grad():
-                output = self.model(expert_tensor, tabular_tensor)
-                adjustment = output['fair_value_adjustment'].item()
+        return valid_experts, tabular_features, current_price, base_value
+
+    def _neural_adjustments(self, prepared: list) -> list[float]:
+        """Neural fair-value adjustment per prepared request (0.0 without torch)."""
+        if not prepared or not TORCH_AVAILABLE or self.model is None:
+            return [0.0] * len(prepared)
+
+        experts = np.zeros((len(prepared), 20), dtype=np.float32)
+        tabular = np.zeros((len(prepared), 30), dtype=np.float32)
+        for row, (valid_experts, tabular_features, current_price, _) in enumerate(prepared):
+            ev = np.asarray(valid_experts[:20], dtype=np.float64) / current_price  # Normalize by price
+            experts[row, :ev.size] = ev
+            tab = np.asarray(tabular_features[:30], dtype=np.float64)  # None -> nan
+            tabular[row, :tab.size] = np.where(np.isfinite(tab), tab, 0.0)
+        expert_tensor = torch.from_numpy(experts)
+        tabular_tensor = torch.from_numpy(tabular)
+
+        with torch.no_grad():
+            output = self.model(expert_tensor, tabular_tensor)
+            return output['fair_value_adjustment'].tolist()
+
+    @staticmethod
+    def _finalize(prepared, adjustment: float) -> dict:
+        valid_experts, _, current_price, base_value = prepared
 
         # Apply adjustment (small, bounded)
         adjustment = np.clip(adjustment, -0.15, 0.15)  # Max 15% adjustment
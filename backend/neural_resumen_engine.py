@@ -14,7 +14,9 @@ from dataclasses import dataclass, field
 from enum import Enum
 import re
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import math
+import threading
 from datetime import datetime
 from scipy.stats import linregress
 from spectral_cycle_analyzer import SpectralCycleAnalyzer, HistoricalDataFetcher
@@ -22,6 +24,10 @@ from company_type_classifier import get_classifier
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for the FMP fetches behind layers 3A and 4A (I/O-bound; threads
+# spend their time waiting on the network, so they overlap well under the GIL).
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='resumen-prefetch')
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # SECTOR BENCHMARKS FOR COMPANY TYPE CLASSIFICATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1533,9 +1539,13 @@ class NeuralResumenEngine:
         # Spectral Cycle Analysis (FFT)
         self.spectral_analyzer = SpectralCycleAnalyzer(window_size=512)
         self.data_fetcher = None  # Initialized when API key is available
+        self._data_fetcher_lock = threading.Lock()
 
         self.layer_results: List[LayerResult] = []
         self._company_type: str = 'blend'
+        # analyze() keeps per-request state on self (layer_results, _company_type,
+        # _freshness_factor, ...), so concurrent callers take turns.
+        self._analyze_lock = threading.Lock()
         self._pivot_s1: Optional[float] = None
 
         # ── Configurable layer weights (default values, can be tuned) ──
@@ -1594,6 +1604,10 @@ class NeuralResumenEngine:
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Main analysis pipeline."""
+        with self._analyze_lock:
+            return self._analyze(data)
+
+    def _analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         if not data or not isinstance(data, dict):
             logger.error("analyze() called with invalid data")
             return {"error": "Invalid input data", "finalRecommendation": "Hold", "conviction": 0}
@@ -1608,6 +1622,10 @@ class NeuralResumenEngine:
 
         logger.info(f"Starting 14-layer analysis for {ticker}")
 
+        # Start the network fetches for layers 3A/4A now so they overlap each
+        # other and layers 1-3; those layers then read the fetcher's cache.
+        prefetch = self._prefetch_market_data(ticker, data.get('fmp_api_key'))
+
         # Layer 1: Data Ingestion
         ingestion_result = self._layer1_ingest(data)
 
@@ -1617,6 +1635,8 @@ class NeuralResumenEngine:
         # Layer 3: Institutional Flow
         holders_result = self._layer3_institutional(data.get('holdersData'))
 
+        wait(prefetch)
+
         # Layer 3A: Sector & Industry Context
         sector_result = self._layer3a_sector_industry(ticker, data.get('fmp_api_key'))
 
@@ -1725,7 +1745,7 @@ class NeuralResumenEngine:
             else float(_profitability_raw)
         )
 
-        # ── Classification via Hybrid Ensemble (RF + KMeans + networkx + QUBO) ──
+        # ── Classification via Hybrid Ensemble (RF + archetype distance + PageRank + QUBO) ──
         _clf_result = get_classifier().classify(
             {
                 'pe_z':        _pe_z,
@@ -1864,6 +1884,37 @@ class NeuralResumenEngine:
                     f"(mult={blended_mult:.2f})"
                 )
 
+    def _get_data_fetcher(self, fmp_api_key: str = None) -> Optional[HistoricalDataFetcher]:
+        """Return the shared fetcher, creating it once when an API key is available.
+
+        Request threads and the prefetch pool all read the same instance (and
+        its cache), so it is only ever assigned under the lock.
+        """
+        if self.data_fetcher is None:
+            api_key = fmp_api_key or os.environ.get('FMP_API_KEY')
+            if not api_key:
+                return None
+            with self._data_fetcher_lock:
+                if self.data_fetcher is None:
+                    self.data_fetcher = HistoricalDataFetcher(api_key)
+                    logger.info("Initialized historical data fetcher")
+        return self.data_fetcher
+
+    def _prefetch_market_data(self, ticker: str, fmp_api_key: str = None) -> List[Future]:
+        """Warm the fetcher cache for layers 3A and 4A concurrently.
+
+        Fetch errors are left to the layers themselves, which retry on a cache
+        miss and report the failure in their LayerResult.
+        """
+        fetcher = self._get_data_fetcher(fmp_api_key)
+        if not fetcher:
+            return []
+        return [
+            _PREFETCH_POOL.submit(fetcher.fetch_company_profile, ticker),
+            _PREFETCH_POOL.submit(fetcher.fetch_sector_industry_data),
+            _PREFETCH_POOL.submit(fetcher.fetch, ticker, 600),
+        ]
+
     def _layer1_ingest(self, data: Dict) -> LayerResult:
         """Layer 1: Data Ingestion & Validation with freshness decay"""
         signals = []
@@ -2039,11 +2090,9 @@ class NeuralResumenEngine:
     def _layer3a_sector_industry(self, ticker: str, fmp_api_key: str = None) -> LayerResult:
         """Layer 3A: Sector & Industry Context Analysis"""
 
-        api_key = fmp_api_key or os.environ.get('FMP_API_KEY')
-        if api_key and not self.data_fetcher:
-            self.data_fetcher = HistoricalDataFetcher(api_key)
+        fetcher = self._get_data_fetcher(fmp_api_key)
 
-        if not self.data_fetcher:
+        if not fetcher:
             result = LayerResult(
                 layer_name="Sector & Industry Context",
                 layer_number=3,
@@ -2057,7 +2106,7 @@ class NeuralResumenEngine:
 
         try:
             # Fetch company profile for sector/industry identification
-            profile = self.data_fetcher.fetch_company_profile(ticker)
+            profile = fetcher.fetch_company_profile(ticker)
             company_sector = profile.get('sector', '')
             company_industry = profile.get('industry', '')
 
@@ -2074,7 +2123,7 @@ class NeuralResumenEngine:
                 return result
 
             # Fetch sector/industry performance data
-            macro_data = self.data_fetcher.fetch_sector_industry_data()
+            macro_data = fetcher.fetch_sector_industry_data()
             sector_perf = macro_data.get('sectorPerformance', [])
             industry_perf = macro_data.get('industryPerformance', [])
             sector_pe_data = macro_data.get('sectorPE', [])
@@ -2279,13 +2328,9 @@ class NeuralResumenEngine:
     def _layer4a_spectral_cycles(self, ticker: str, current_price: float, fmp_api_key: str = None) -> LayerResult:
         """Layer 4A: Spectral Cycle Analysis (FFT-based market cycle detection)"""
 
-        # Initialize data fetcher if we have an API key
-        api_key = fmp_api_key or os.environ.get('FMP_API_KEY')
-        if api_key and not self.data_fetcher:
-            self.data_fetcher = HistoricalDataFetcher(api_key)
-            logger.info("Initialized historical data fetcher for FFT analysis")
+        fetcher = self._get_data_fetcher(fmp_api_key)
 
-        if not self.data_fetcher:
+        if not fetcher:
             result = LayerResult(
                 layer_name="Spectral Cycle Analysis (FFT)",
                 layer_number=4,
@@ -2299,7 +2344,7 @@ class NeuralResumenEngine:
 
         try:
             # Fetch historical daily prices
-            historical = self.data_fetcher.fetch(ticker, max_bars=600)
+            historical = fetcher.fetch(ticker, max_bars=600)
 
             if not historical or len(historical) < 256:
                 bars = len(historical) if historical else 0
@@ -15,6 +15,7 @@ from __future__ import annotations
 # - Risk-reward ratio (vs 5th percentile worst case)
 
 import logging
+import threading
 import traceback
 from datetime import datetime, timedelta
 from math import exp, log, sqrt
@@ -61,11 +62,21 @@ class BinomialTreeEngine:
         self.max_steps = 2000  # Maximum tree depth (increased for convergence)
         self.convergence_tol = 0.005  # 0.5% tolerance for CRR vs BS
         self.data_fetcher = None  # Injected from spectral_cycle_analyzer
+        self._data_fetcher_lock = threading.Lock()
         self._hist_vol_cache: Dict[str, float | None] = {}
         self._hist_drift_cache: Dict[str, float] = {}
         self._ewma_vol_cache: Dict[str, float] = {}
         self._drift_confidence_cache: Dict[str, float] = {}
 
+    def _get_data_fetcher(self, fmp_api_key: str):
+        """Return the shared fetcher, creating it once even under concurrent calls."""
+        if self.data_fetcher is None:
+            with self._data_fetcher_lock:
+                if self.data_fetcher is None:
+                    from spectral_cycle_analyzer import HistoricalDataFetcher
+                    self.data_fetcher = HistoricalDataFetcher(fmp_api_key)
+        return self.data_fetcher
+
     def calculate(
         self,
         ticker: str,
@@ -554,17 +565,14 @@ class BinomialTreeEngine:
             return None
 
         try:
-            from spectral_cycle_analyzer import HistoricalDataFetcher
-
-            if not self.data_fetcher:
-                self.data_fetcher = HistoricalDataFetcher(fmp_api_key)
+            fetcher = self._get_data_fetcher(fmp_api_key)
 
             # Fetch 500+ days for better drift estimation
             historical = None
             max_retries = 3
             for attempt in range(1, max_retries + 1):
                 try:
-                    historical = self.data_fetcher.fetch(ticker, max_bars=600)
+                    historical = fetcher.fetch(ticker, max_bars=600)
                     if historical:
                         break
                 except Exception as fetch_err:
@@ -1014,12 +1022,9 @@ class BinomialTreeEngine:
             if not fmp_api_key:
                 return None
 
-            from spectral_cycle_analyzer import HistoricalDataFetcher
-
-            if not self.data_fetcher:
-                self.data_fetcher = HistoricalDataFetcher(fmp_api_key)
+            fetcher = self._get_data_fetcher(fmp_api_key)
 
-            historical = self.data_fetcher.fetch(ticker, max_bars=300)
+            historical = fetcher.fetch(ticker, max_bars=300)
             if not historical or len(historical) < 30:
                 return None
 
@@ -1,8 +1,11 @@
 # backend/quality_model.py
 # CompanyQuality Net - Neural Ensemble for Company Quality Assessment
 
+import logging
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
 
 try:
     import torch
@@ -11,7 +14,7 @@ try:
     TORCH_AVAILABLE = True
 except ImportError:
     TORCH_AVAILABLE = False
-    print("[WARNING] PyTorch not available - using fallback quality predictor")
+    logger.warning("PyTorch not available - using fallback quality predictor")
 
 
 if TORCH_AVAILABLE:
@@ -83,9 +86,9 @@ class CompanyQualityPredictor:
         # Set to True only when we have a trained model file to load
         self.use_neural = False
 
-        print("[CompanyQualityNet] Using heuristic-based quality assessment")
+        logger.info("[CompanyQualityNet] Using heuristic-based quality assessment")
 
-    def predict(self, features: List[float]) -> Dict:
+    def predict(self, features: Union[List[float], np.ndarray]) -> Dict:
         """
         Generate quality assessment from financial features.
 
@@ -95,28 +98,24 @@ class CompanyQualityPredictor:
         Returns:
             Dictionary with quality scores and recommendations
         """
-        print(f"[Quality] Input features (first 10): {features[:10]}")
+        logger.debug("[Quality] Input features (first 10): %s", features[:10])
 
         # Pad or truncate features to expected size
         features = self._normalize_features(features)
 
-        print(f"[Quality] After normalization (first 10): {features[:10]}")
+        logger.debug("[Quality] After normalization (first 10): %s", features[:10])
 
         if self.use_neural and self.model is not None:
             return self._neural_predict(features)
         else:
             return self._heuristic_predict(features)
 
-    def _normalize_features(self, features: List[float], target_size: int = 45) -> List[float]:
+    def _normalize_features(self, features: Union[List[float], np.ndarray], target_size: int = 45) -> List[float]:
         """Normalize feature list to expected size"""
-        features = [f if f is not None and np.isfinite(f) else 0 for f in features]
-
-        if len(features) < target_size:
-            features = features + [0] * (target_size - len(features))
-        elif len(features) > target_size:
-            features = features[:target_size]
-
-        return features
+        values = np.asarray(features, dtype=np.float64)[:target_size]  # None -> nan
+        normalized = np.zeros(target_size)
+        normalized[:values.size] = np.where(np.isfinite(values), values, 0.0)
+        return normalized.tolist()
 
     def _neural_predict(self, features: List[float]) -> Dict:
         """Use neural network for prediction"""
@@ -165,10 +164,10 @@ class CompanyQualityPredictor:
         # [24-27] Yield: FCF yield, earnings yield, div yield, payout
         # [28-29] Scores: Altman Z, Piotroski
 
-        print(f"[Quality] Received {len(features)} features")
-        print(f"[Quality] Profitability features[0:7]: {features[0:7]}")
-        print(f"[Quality] Solvency features[7:13]: {features[7:13]}")
-        print(f"[Quality] Scores features[28:30]: {features[28:30]}")
+        logger.debug("[Quality] Received %d features", len(features))
+        logger.debug("[Quality] Profitability features[0:7]: %s", features[0:7])
+        logger.debug("[Quality] Solvency features[7:13]: %s", features[7:13])
+        logger.debug("[Quality] Scores features[28:30]: %s", features[28:30])
 
         # Calculate dimension scores
         profitability = self._score_profitability(features[0:7])
@@ -177,7 +176,8 @@ class CompanyQualityPredictor:
         growth = self._score_growth(features)
         moat = self._score_moat(features)
 
-        print(f"[Quality] DIMENSION SCORES: prof={profitability}, fin={financial_strength}, eff={efficiency}, growth={growth}, moat={moat}")
+        logger.debug("[Quality] DIMENSION SCORES: prof=%s, fin=%s, eff=%s, growth=%s, moat=%s",
+                     profitability, financial_strength, efficiency, growth, moat)
 
         # Overall score (weighted average)
         overall = float(
@@ -188,7 +188,8 @@ class CompanyQualityPredictor:
             moat * 0.15
         )
 
-        print(f"[Quality] OVERALL CALCULATION: {profitability}*0.25 + {financial_strength}*0.25 + {efficiency}*0.20 + {growth}*0.15 + {moat}*0.15 = {overall}")
+        logger.debug("[Quality] OVERALL CALCULATION: %s*0.25 + %s*0.25 + %s*0.20 + %s*0.15 + %s*0.15 = %s",
+                     profitability, financial_strength, efficiency, growth, moat, overall)
 
         # Determine risk level
         if financial_strength >= 70 and overall >= 60:
@@ -220,7 +221,7 @@ class CompanyQualityPredictor:
             'riskLevel': risk_level,
             'recommendation': recommendation
         }
-        print(f"[Quality] FINAL RESULT: {result}")
+        logger.debug("[Quality] FINAL RESULT: %s", result)
         return result
 
     def _score_profitability(self, metrics: List[float]) -> float:
@@ -267,7 +268,8 @@ class CompanyQualityPredictor:
         if op_margin > 0.20: score += 5
         elif op_margin > 0.10: score += 3
 
-        print(f"[Quality] Profitability: ROE={roe:.3f}, ROA={roa:.3f}, ROIC={roic:.3f}, NetMargin={net_margin:.3f} -> Score={score}")
+        logger.debug("[Quality] Profitability: ROE=%.3f, ROA=%.3f, ROIC=%.3f, NetMargin=%.3f -> Score=%s",
+                     roe, roa, roic, net_margin, score)
         return max(0, min(100, score))
 
     def _score_solvency(self, solvency: List[float], scores: List[float]) -> float:
@@ -310,7 +312,8 @@ class CompanyQualityPredictor:
         elif piotroski >= 5: score += 5
         elif piotroski <= 3: score -= 10
 
-        print(f"[Quality] Solvency: D/E={de_ratio:.2f}, Current={current:.2f}, IntCov={int_cov:.2f}, Altman={altman_z:.2f}, Piotroski={piotroski} -> Score={score}")
+        logger.debug("[Quality] Solvency: D/E=%.2f, Current=%.2f, IntCov=%.2f, Altman=%.2f, Piotroski=%s -> Score=%s",
+                     de_ratio, current, int_cov, altman_z, piotroski, score)
         return max(0, min(100, score))
 
     def _score_efficiency(self, metrics: List[float]) -> float:
@@ -6,6 +6,7 @@ from __future__ import annotations
 # Generates trading signals based on cycle phase, momentum, and volatility
 
 import logging
+import threading
 import time
 import numpy as np
 from scipy import signal as scipy_signal
@@ -13,11 +14,29 @@ from scipy.signal import hilbert as scipy_hilbert
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import traceback
 
 logger = logging.getLogger(__name__)
 
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _http_session() -> requests.Session:
+    """Process-wide keep-alive session for FMP, shared by every fetcher so
+    repeat requests reuse pooled connections instead of a new TLS handshake."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+                _SESSION = session
+    return _SESSION
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATA STRUCTURES
@@ -123,11 +142,11 @@ class TechnicalIndicators:
 class HistoricalDataFetcher:
     """Fetch and cache historical price data from Financial Modeling Prep API"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self._cache: Dict[str, Tuple[List[Dict], float]] = {}
         self.cache_ttl = 300  # 5 minutes
-        self._session = requests.Session()
+        self._session = session if session is not None else _http_session()
         self._max_retries = 3
         self._retry_delay = 1.0  # seconds
 
@@ -195,14 +214,10 @@ class HistoricalDataFetcher:
                         bar['low'] = bar.get('low', raw_close) * ratio
                         bar['close'] = adj_close
 
-                # Trim to max_bars
-                if len(historical) > max_bars:
-                    historical = historical[-max_bars:]
-
-                # Cache
+                # Cache the full series; a later call may ask for more bars
                 self._cache[ticker] = (historical, now)
                 logger.info("Got %d bars for %s", len(historical), ticker)
-                return historical
+                return historical[-max_bars:] if len(historical) > max_bars else historical
 
             except requests.exceptions.Timeout:
                 logger.warning("Timeout fetching %s (attempt %d/%d)", ticker, attempt, self._max_retries)
@@ -245,7 +260,8 @@ class HistoricalDataFetcher:
             'industryPE': 'industry-pe-snapshot',
         }
 
-        for key, endpoint in endpoints.items():
+        def _get(item: Tuple[str, str]) -> None:
+            key, endpoint = item
             try:
                 url = f"https://financialmodelingprep.com/stable/{endpoint}?apikey={self.api_key}"
                 response = self._session.get(url, timeout=10)
@@ -259,6 +275,10 @@ class HistoricalDataFetcher:
             except Exception as e:
                 logger.error("Error fetching %s: %s", key, e)
 
+        # The four snapshots are independent; fetch them concurrently
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            list(pool.map(_get, endpoints.items()))
+
         self._cache[cache_key] = (result, now)
         return result
 
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip('sklearn')
+
+import numpy as np
+
+import company_type_classifier as ctc
+
+
+@pytest.fixture(scope='module')
+def clf():
+    c = ctc.HybridCompanyClassifier()
+    assert c._trained
+    return c
+
+
+def _random_inputs(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.hstack([rng.uniform(-3.0, 3.0, (n, 4)), rng.uniform(0.0, 1.0, (n, 4))])
+
+
+def test_archetype_clusters_match_sklearn_kmeans(clf):
+    from sklearn.cluster import KMeans
+
+    X, y = ctc._build_synthetic_dataset(n_per_class=120)
+    scaler = clf._scaler
+    arch = scaler.transform(np.array([ctc._ARCHETYPES[c] for c in ctc.CLASSES]))
+    km = KMeans(n_clusters=4, init=arch, n_init=1, random_state=42).fit(scaler.transform(X))
+    np.testing.assert_allclose(clf._km_centers, km.cluster_centers_, atol=1e-8)
+
+    cluster_class = [np.bincount(y[km.labels_ == k], minlength=4).argmax() for k in range(4)]
+    probe = _random_inputs(400, seed=1)
+    expected = [ctc.CLASSES[cluster_class[k]] for k in km.predict(scaler.transform(probe))]
+    assert [r['kmType'] for r in clf.classify_many(probe)] == expected
+